@@ -2,14 +2,24 @@
 Main entry point for the FastAPI application.
 Starts the uvicorn server and configures the app.
 """
+import asyncio
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 
 from settings import get_settings
-from dependencies import get_databridge
-from routers import users, projects
+from dependencies import get_activity_service, get_databridge, get_shard_router, get_user_service
+from database.keepalive import keepalive_loop
+from database.partitions import partition_maintenance_loop
+from middleware.admission import AdmissionControlMiddleware
+from middleware.deadline import RequestDeadlineMiddleware
+from middleware.profiling import RequestProfilingMiddleware
+from middleware.response_cache import ResponseCacheMiddleware
+from middleware.wake import PrewakeMiddleware
+from services.cache import data_versions
+from routers import users, projects, activity, dashboard, debug
 
 
 @asynccontextmanager
@@ -27,11 +37,41 @@ async def lifespan(app: FastAPI):
     # db = get_databridge()
     # await db.connect()
     
+    # Pick up background user deletions interrupted by a restart or redeploy
+    resume = asyncio.create_task(get_user_service().resume_deletions())
+    
+    # Keep upcoming archive partitions created
+    maintenance = None
+    if settings.partition_maintenance_interval_hours > 0:
+        maintenance = asyncio.create_task(
+            partition_maintenance_loop(get_databridge(), settings.partition_maintenance_interval_hours)
+        )
+    
+    # Keep serverless compute awake during scheduled hours
+    keepalive = None
+    if settings.db_keepalive_schedule:
+        keepalive = asyncio.create_task(keepalive_loop(
+            get_databridge(),
+            settings.db_keepalive_schedule,
+            settings.db_keepalive_interval_seconds,
+            settings.db_keepalive_timezone or None
+        ))
+    
     yield
     
+    resume.cancel()
+    if maintenance:
+        maintenance.cancel()
+    if keepalive:
+        keepalive.cancel()
+    
     # Shutdown
+    await get_activity_service().stop()  # Write out buffered activity before the pool closes
     db = get_databridge()
     await db.disconnect()
+    shards = get_shard_router()
+    if shards:
+        await shards.disconnect()
     print("👋 Application shutdown complete")
 
 
@@ -43,6 +83,48 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Configure per-request profiling (only when an admin token is set, so it costs nothing otherwise)
+if settings.debug_admin_token:
+    app.add_middleware(
+        RequestProfilingMiddleware,
+        admin_token=settings.debug_admin_token,
+        interval=settings.profile_sample_interval_ms / 1000,
+    )
+
+# Configure request deadlines (shed requests never start a task)
+app.add_middleware(
+    RequestDeadlineMiddleware,
+    default_seconds=settings.request_deadline_seconds,
+)
+
+# Configure admission control (added before CORS so CORS wraps its 503 responses)
+if settings.admission_control_enabled:
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        databridge_getter=get_databridge,
+        max_queue_depth=settings.admission_max_queue_depth,
+        max_wait_ms=settings.admission_max_wait_ms,
+        retry_after=settings.admission_retry_after,
+    )
+
+# Configure the response cache (outside admission control, so hits are served even when shedding)
+if settings.response_cache_enabled:
+    app.add_middleware(
+        ResponseCacheMiddleware,
+        versions=data_versions,
+        max_bytes=int(settings.response_cache_max_mb * 1024 * 1024),
+        ttl_seconds=settings.response_cache_ttl_seconds,
+        compress_min_bytes=settings.response_cache_compress_min_bytes if settings.response_cache_compress else None,
+    )
+
+# Configure pre-wake (outside admission control and deadlines, so the wake-up overlaps the whole request)
+if settings.db_prewake_idle_seconds > 0:
+    app.add_middleware(
+        PrewakeMiddleware,
+        databridge_getter=get_databridge,
+        idle_seconds=settings.db_prewake_idle_seconds,
+    )
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -52,9 +134,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(asyncio.TimeoutError)
+async def deadline_exceeded_handler(request: Request, exc: asyncio.TimeoutError):
+    """Map database deadline expiry to 504"""
+    return JSONResponse(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        content={"detail": "Database deadline exceeded"}
+    )
+
+
 # Include routers
 app.include_router(users.router, prefix="/api/v1")
 app.include_router(projects.router, prefix="/api/v1")
+app.include_router(dashboard.router, prefix="/api/v1")
+app.include_router(activity.router, prefix="/api/v1")
+app.include_router(debug.router)
 
 
 @app.get("/")
@@ -73,6 +167,25 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness endpoint - verifies the database is reachable"""
+    db = get_databridge()
+    try:
+        await db.fetch_val("SELECT 1")
+    except Exception as e:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "unavailable", "detail": str(e)}
+        )
+    return {
+        "status": "ready",
+        "pool": db.pool_stats(),
+        "queries": db.query_stats,
+        "connects": db.connect_stats,
+    }
+
+
 def start():
     """Start the uvicorn server"""
     settings = get_settings()
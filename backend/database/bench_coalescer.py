@@ -0,0 +1,89 @@
+"""
+Benchmark concurrent project creates with group commit off and on.
+Every create goes through ProjectService.create_project; with coalescing on, concurrent
+creates share one multi-row INSERT and one commit.
+
+Creates a scratch owner, reports throughput and latency for each mode, and deletes the
+owner (cascading to its projects) afterwards.
+Run with: python -m database.bench_coalescer
+"""
+import asyncio
+import os
+import statistics
+import time
+from models.project import ProjectCreate
+from services.project_service import ProjectService
+from dependencies import get_databridge
+from settings import get_settings
+
+
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "64"))
+CREATES = int(os.getenv("BENCH_CREATES", "5000"))
+WINDOWS_MS = [float(ms) for ms in os.getenv("BENCH_WINDOWS_MS", "1,2,5").split(",")]
+
+
+async def run_creates(service: ProjectService, owner_id: int) -> tuple[float, list[float]]:
+    """Create CREATES projects from CONCURRENCY workers; wall time and per-create latencies"""
+    latencies = []
+    remaining = iter(range(CREATES))
+
+    async def worker():
+        for i in remaining:
+            started = time.perf_counter()
+            await service.create_project(
+                ProjectCreate(name=f"Bench project {i}", description="group commit bench", owner_id=owner_id)
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+    return time.perf_counter() - started, latencies
+
+
+def report(label: str, elapsed: float, latencies: list[float], service: ProjectService):
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    line = (
+        f"   {label:<22} {len(latencies) / elapsed:8.0f} creates/s"
+        f"  p50 {statistics.median(latencies):6.2f} ms  p99 {p99:6.2f} ms"
+    )
+    coalescer = service._create_coalescer
+    if coalescer:
+        stats = coalescer.stats
+        line += f"  avg batch {stats['items'] / max(stats['batches'], 1):5.1f}"
+    print(line)
+
+
+async def bench_coalescer():
+    db = get_databridge()
+    settings = get_settings()
+    print(f"📊 Project creates: {CREATES} creates from {CONCURRENCY} concurrent callers")
+
+    try:
+        owner_id = await db.fetch_val(
+            """
+            INSERT INTO users (username, email, full_name)
+            VALUES ('bench_coalescer', 'bench_coalescer@example.com', 'Bench Coalescer')
+            RETURNING id
+            """
+        )
+        try:
+            service = ProjectService(db, settings.model_copy(update={"project_write_coalescing": False}))
+            elapsed, latencies = await run_creates(service, owner_id)
+            report("coalescing off", elapsed, latencies, service)
+
+            for window_ms in WINDOWS_MS:
+                service = ProjectService(db, settings.model_copy(update={
+                    "project_write_coalescing": True,
+                    "project_write_coalesce_window_ms": window_ms,
+                }))
+                elapsed, latencies = await run_creates(service, owner_id)
+                report(f"coalescing {window_ms:g} ms", elapsed, latencies, service)
+        finally:
+            await db.execute("DELETE FROM users WHERE id = $1", owner_id)
+    finally:
+        await db.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(bench_coalescer())
@@ -0,0 +1,104 @@
+"""
+Benchmark project list rendering: Python (asyncpg records -> dicts -> ProjectResponse ->
+JSON, as FastAPI does for response_model) vs Postgres-side JSON (DB_JSON_RENDERING).
+Also checks that both paths produce byte-identical bodies.
+
+Creates a scratch owner with projects covering escaping and timestamp edge cases,
+and deletes it (cascading to its projects) afterwards.
+Run with: python -m database.bench_json
+"""
+import asyncio
+import os
+import statistics
+import time
+from typing import List
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from models.project import ProjectResponse
+from services.project_service import ProjectService
+from dependencies import get_databridge
+
+
+PROJECT_COUNTS = [int(n) for n in os.getenv("BENCH_PROJECT_COUNTS", "100,1000,10000").split(",")]
+REPEAT = int(os.getenv("BENCH_REPEAT", "20"))
+
+response_adapter = TypeAdapter(List[ProjectResponse])
+
+
+async def python_body(service: ProjectService, owner_id: int) -> bytes:
+    """The response_model path: validate, serialize, then JSONResponse renders"""
+    projects = await service.get_projects_by_owner(owner_id)
+    content = response_adapter.dump_python(response_adapter.validate_python(projects), mode="json")
+    return JSONResponse(content).body
+
+
+async def database_body(service: ProjectService, owner_id: int) -> bytes:
+    """The DB_JSON_RENDERING path: Postgres returns the body as text"""
+    return (await service.get_projects_json(owner_id)).encode()
+
+
+async def measure(render, service: ProjectService, owner_id: int) -> float:
+    """Median milliseconds over REPEAT renders"""
+    timings = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        await render(service, owner_id)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+async def add_projects(db, owner_id: int, count: int):
+    """Projects with quotes, control characters, non-ASCII text, NULLs and whole-second timestamps"""
+    await db.execute(
+        """
+        INSERT INTO projects (name, description, owner_id, status, created_at, updated_at)
+        SELECT 'Projekt "' || g || E'" ü☃ \\\\ /',
+               CASE WHEN g % 3 = 0 THEN NULL ELSE E'line one\\nline two\\ttab \\x01 ' || md5(g::text) END,
+               $1, 'active',
+               date_trunc(CASE WHEN g % 5 = 0 THEN 'second' ELSE 'microseconds' END,
+                          now() - g * interval '1.000001 second'),
+               now()
+        FROM generate_series(1, $2::int) AS g
+        """,
+        owner_id,
+        count
+    )
+
+
+async def bench_json():
+    db = get_databridge()
+    service = ProjectService(db)
+    print("📊 Project list rendering: Python models vs Postgres JSON")
+
+    try:
+        owner_id = await db.fetch_val(
+            """
+            INSERT INTO users (username, email, full_name)
+            VALUES ('bench_json', 'bench_json@example.com', 'Bénch "JSON" Öwner')
+            RETURNING id
+            """
+        )
+        try:
+            existing = 0
+            for count in PROJECT_COUNTS:
+                await add_projects(db, owner_id, count - existing)
+                existing = count
+
+                python_bytes = await python_body(service, owner_id)
+                database_bytes = await database_body(service, owner_id)
+                identical = "identical" if python_bytes == database_bytes else "❌ DIFFERENT"
+
+                python_ms = await measure(python_body, service, owner_id)
+                database_ms = await measure(database_body, service, owner_id)
+                print(
+                    f"   {count:>7} projects  python: {python_ms:8.2f} ms  postgres: {database_ms:8.2f} ms"
+                    f"  ({python_ms / database_ms:4.1f}x)  bodies {identical}"
+                )
+        finally:
+            await db.execute("DELETE FROM users WHERE id = $1", owner_id)
+    finally:
+        await db.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(bench_json())
@@ -0,0 +1,142 @@
+"""
+Benchmark the active-project list queries on a flat vs a status-partitioned projects table
+as the volume of archived projects grows.
+
+Builds two scratch schemas (bench_flat, bench_partitioned) holding the same data, runs the
+service's own list queries against each, and drops the schemas afterwards.
+Run with: python -m database.bench_partitions
+"""
+import asyncio
+import json
+import os
+import statistics
+import time
+from datetime import datetime
+from database.partitions import (
+    create_archive_partition, create_partition_indexes, create_partitioned_projects
+)
+from database.queries import project_list
+from dependencies import get_databridge
+
+
+OWNERS = int(os.getenv("BENCH_OWNERS", "1000"))
+ACTIVE_PROJECTS = int(os.getenv("BENCH_ACTIVE_PROJECTS", "5000"))
+ARCHIVED_STEPS = [int(n) for n in os.getenv("BENCH_ARCHIVED_STEPS", "0,100000,1000000").split(",")]
+REPEAT = int(os.getenv("BENCH_REPEAT", "20"))
+YEARS_OF_HISTORY = 5
+
+QUERIES = {
+    "active list": (project_list(("status",)), ("active",)),
+    "active by owner": (project_list(("owner_id", "status")), (1, "active")),
+}
+
+
+async def create_schema(conn, schema: str, partitioned: bool):
+    """Create a scratch schema with users and either a flat or a partitioned projects table"""
+    await conn.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+    await conn.execute(f"CREATE SCHEMA {schema}")
+    await conn.execute(f"SET search_path TO {schema}")
+    await conn.execute("""
+        CREATE TABLE users (
+            id SERIAL PRIMARY KEY,
+            username VARCHAR(50) UNIQUE NOT NULL,
+            email VARCHAR(100) UNIQUE NOT NULL,
+            full_name VARCHAR(100),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            deleted_at TIMESTAMP
+        )
+    """)
+    await conn.execute("""
+        INSERT INTO users (username, email, full_name)
+        SELECT 'user' || g, 'user' || g || '@example.com', 'User ' || g
+        FROM generate_series(1, $1::int) AS g
+    """, OWNERS)
+
+    if partitioned:
+        await create_partitioned_projects(conn)
+        this_year = datetime.now().year
+        for year in range(this_year - YEARS_OF_HISTORY, this_year + 2):
+            await create_archive_partition(conn, year)
+    else:
+        await conn.execute("""
+            CREATE TABLE projects (
+                id SERIAL PRIMARY KEY,
+                name VARCHAR(100) NOT NULL,
+                description TEXT,
+                owner_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+                status VARCHAR(20) DEFAULT 'active',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        await conn.execute("CREATE INDEX idx_projects_status ON projects(status)")
+    await create_partition_indexes(conn)
+    await insert_projects(conn, "active", ACTIVE_PROJECTS)
+
+
+async def insert_projects(conn, status: str, count: int):
+    """Insert `count` projects with the given status, spread over owners and years"""
+    if count <= 0:
+        return
+    await conn.execute(f"""
+        INSERT INTO projects (name, description, owner_id, status, created_at, updated_at)
+        SELECT 'Project ' || g, repeat('history ', 20), 1 + (g % $2::int), $3,
+               now() - random() * interval '{YEARS_OF_HISTORY} years', now()
+        FROM generate_series(1, $1::int) AS g
+    """, count, OWNERS, status)
+
+
+async def measure(conn, query: str, args: tuple) -> tuple[float, int]:
+    """Median latency in ms over REPEAT runs, and buffers touched by one run"""
+    timings = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        await conn.fetch(query, *args)
+        timings.append((time.perf_counter() - started) * 1000)
+    plan = json.loads(await conn.fetchval(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}", *args))
+    top = plan[0]["Plan"]
+    buffers = top.get("Shared Hit Blocks", 0) + top.get("Shared Read Blocks", 0)
+    return statistics.median(timings), buffers
+
+
+async def bench_partitions():
+    """Grow the archived volume step by step and compare both layouts"""
+    db = get_databridge()
+    schemas = {"flat": "bench_flat", "partitioned": "bench_partitioned"}
+    print(f"📊 Active-project list latency: {ACTIVE_PROJECTS} active projects, {OWNERS} owners")
+
+    try:
+        async with db.get_connection() as conn:
+            for layout, schema in schemas.items():
+                await create_schema(conn, schema, layout == "partitioned")
+
+            archived = 0
+            for target in ARCHIVED_STEPS:
+                for schema in schemas.values():
+                    await conn.execute(f"SET search_path TO {schema}")
+                    await insert_projects(conn, "archived", target - archived)
+                    await conn.execute("ANALYZE projects")
+                archived = target
+
+                for name, (query, args) in QUERIES.items():
+                    results = {}
+                    for layout, schema in schemas.items():
+                        await conn.execute(f"SET search_path TO {schema}")
+                        results[layout] = await measure(conn, query, args)
+                    print(
+                        f"   archived={archived:>9}  {name:<16}"
+                        + "".join(
+                            f"  {layout}: {ms:7.2f} ms {buffers:>7} buffers"
+                            for layout, (ms, buffers) in results.items()
+                        )
+                    )
+
+            for schema in schemas.values():
+                await conn.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+    finally:
+        await db.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(bench_partitions())
@@ -3,9 +3,73 @@ Database connection and query interface.
 Acts as a bridge between services and the PostgreSQL database.
 """
 from typing import Optional, Any
+from contextvars import ContextVar
+import asyncio
+import contextvars
+import itertools
+import random
+import time
 import asyncpg
 from contextlib import asynccontextmanager
-from settings import get_settings
+from settings import AppConfig, get_settings
+
+
+# Row estimate for a table; a partitioned parent stays at -1, so add up its leaves
+# (unanalyzed leaves report -1 and count as empty)
+ESTIMATE_COUNT = """
+SELECT CASE WHEN c.relkind = 'p' THEN (
+           SELECT SUM(GREATEST(leaf.reltuples, 0))::bigint
+           FROM pg_partition_tree(c.oid) tree
+           JOIN pg_class leaf ON leaf.oid = tree.relid
+           WHERE leaf.relkind = 'r'
+       ) ELSE c.reltuples::bigint END
+FROM pg_class c
+WHERE c.oid = $1::regclass
+"""
+
+# Absolute monotonic deadline for the current request's database work (None = no deadline)
+request_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+def set_request_deadline(seconds: float):
+    """Narrow the current request's deadline to at most `seconds` from now"""
+    deadline = time.monotonic() + seconds
+    current = request_deadline.get()
+    if current is None or deadline < current:
+        request_deadline.set(deadline)
+
+
+def remaining_deadline() -> Optional[float]:
+    """
+    Seconds left before the current request's deadline, or None if there is none.
+    Raises asyncio.TimeoutError if the deadline has already passed.
+    """
+    deadline = request_deadline.get()
+    if deadline is None:
+        return None
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise asyncio.TimeoutError("Request deadline exceeded before query was sent")
+    return remaining
+
+
+# Connect failures worth retrying: network errors, timeouts and servers still starting up.
+# Authentication and configuration errors fail immediately.
+RETRYABLE_CONNECT_ERRORS = (
+    OSError,
+    asyncio.TimeoutError,
+    asyncpg.PostgresConnectionError,
+    asyncpg.CannotConnectNowError,
+    asyncpg.InternalServerError,
+    asyncpg.ConnectionDoesNotExistError,
+)
+
+POOL_MIN_SIZE = 2
+POOL_MAX_SIZE = 10
+# Connections one gather_in_snapshot may hold at once. Concurrent gathers are limited so they
+# can never hold the whole pool: leaders holding connections while their followers wait for
+# one would otherwise deadlock until the deadline.
+SNAPSHOT_GATHER_WIDTH = 3
 
 
 class DataBridge:
@@ -14,34 +78,140 @@ class DataBridge:
     Uses asyncpg for async PostgreSQL operations.
     """
     
-    def __init__(self):
+    def __init__(self, settings: Optional[AppConfig] = None):
         self.pool: Optional[asyncpg.Pool] = None
-        self.settings = get_settings()
+        self.settings = settings or get_settings()
+        # Coroutines currently blocked in pool.acquire(), keyed by ticket -> start time
+        self._acquire_waiters: dict[int, float] = {}
+        self._acquire_tickets = itertools.count()
+        # Queries stopped early by a deadline or a client disconnect
+        self.query_stats = {
+            "timed_out": 0,
+            "cancelled": 0,
+            "cancelled_ms": 0.0,   # DB time already spent on queries that were cancelled
+            "reclaimed_ms": 0.0,   # Deadline budget those queries no longer hold a connection for
+        }
+        # Physical connects, and how many of them waited on a compute wake-up
+        self.connect_stats = {
+            "connects": 0,
+            "retries": 0,
+            "failures": 0,
+            "wakeups": 0,             # Connects slower than DB_WAKEUP_THRESHOLD_MS
+            "max_wakeup_ms": 0.0,
+            "request_wakeups": 0,     # Wake-ups a request was waiting on
+            "request_wakeup_ms": 0.0, # Total wake-up time requests spent waiting
+        }
+        self.last_query_at: Optional[float] = None  # Monotonic time the last query finished
+        self._connect_lock = asyncio.Lock()
+        self._wake_task: Optional[asyncio.Task] = None
+        self._snapshot_slots = asyncio.Semaphore(POOL_MAX_SIZE // SNAPSHOT_GATHER_WIDTH)
     
     async def connect(self):
         """Initialize database connection pool"""
-        if self.pool is None:
-            # Try to use DATABASE_URL first (preferred for Neon), fallback to individual components
-            if self.settings.database_url:
-                self.pool = await asyncpg.create_pool(
-                    self.settings.database_url,
-                    min_size=2,
-                    max_size=10,
-                    ssl='require'  # Required for Neon
-                )
-                print(f"✓ Database pool connected using connection string")
-            else:
-                self.pool = await asyncpg.create_pool(
-                    host=self.settings.db_host,
-                    port=self.settings.db_port,
-                    database=self.settings.db_name,
-                    user=self.settings.db_user,
-                    password=self.settings.db_password,
-                    min_size=2,
-                    max_size=10,
-                    ssl='require'  # Required for Neon
+        async with self._connect_lock:
+            if self.pool is None:
+                # Try to use DATABASE_URL first (preferred for Neon), fallback to individual components
+                args, kwargs = self._connect_args()
+                self.pool = await asyncpg.create_pool(*args, **kwargs, **self._pool_options())
+                if self.settings.database_url:
+                    print(f"✓ Database pool connected using connection string")
+                else:
+                    print(f"  Database pool connected to {self.settings.db_host}:{self.settings.db_port}")
+    
+    def _connect_args(self) -> tuple[tuple, dict]:
+        """Where to connect: DATABASE_URL if set, otherwise the individual components"""
+        if self.settings.database_url:
+            return (self.settings.database_url,), {}
+        return (), {
+            "host": self.settings.db_host,
+            "port": self.settings.db_port,
+            "database": self.settings.db_name,
+            "user": self.settings.db_user,
+            "password": self.settings.db_password,
+        }
+    
+    def _pool_options(self) -> dict:
+        """Pool sizing; every new pooled connection goes through _open_connection"""
+        return {
+            "min_size": POOL_MIN_SIZE,
+            "max_size": POOL_MAX_SIZE,
+            "connect": self._open_connection,
+            **self._connection_options(),
+        }
+    
+    def _connection_options(self) -> dict:
+        """Options for every physical connection, pooled or standalone"""
+        options = {
+            "ssl": self.settings.db_ssl,
+            "timeout": self.settings.db_connect_timeout_seconds,
+        }
+        
+        pgbouncer_mode = self.settings.db_pgbouncer_mode
+        if pgbouncer_mode == "off":
+            # Server-side ceiling, so queries stop even if this worker dies mid-request.
+            # PgBouncer rejects startup parameters like this, so behind it set it on the role.
+            options["server_settings"] = {"statement_timeout": str(self.settings.db_statement_timeout_ms)}
+        elif pgbouncer_mode == "transaction":
+            # Each transaction may land on a different server connection, so named
+            # prepared statements can't be cached; asyncpg then uses unnamed statements
+            options["statement_cache_size"] = 0
+        elif pgbouncer_mode != "protocol":
+            # protocol: PgBouncer tracks named statements itself, so the cache stays on
+            raise ValueError(f"Unknown DB_PGBOUNCER_MODE: {pgbouncer_mode}")
+        
+        return options
+    
+    async def _open_connection(self, *args, **kwargs) -> asyncpg.Connection:
+        """
+        Open one physical connection, retrying with jittered exponential backoff.
+        A suspended serverless compute (Neon) makes the first connect slow or fail while
+        it wakes up; slow connects are counted as wake-ups, split by whether a request
+        (which always carries a deadline) was waiting on them.
+        """
+        settings = self.settings
+        started = time.monotonic()
+        for attempt in range(settings.db_connect_retries + 1):
+            try:
+                connection = await asyncpg.connect(*args, **kwargs)
+                break
+            except RETRYABLE_CONNECT_ERRORS as e:
+                if attempt == settings.db_connect_retries:
+                    self.connect_stats["failures"] += 1
+                    raise
+                self.connect_stats["retries"] += 1
+                # Full jitter: spread reconnects from many workers across the backoff window
+                backoff_ms = min(
+                    settings.db_connect_backoff_max_ms, settings.db_connect_backoff_base_ms * 2 ** attempt
                 )
-                print(f"  Database pool connected to {self.settings.db_host}:{self.settings.db_port}")
+                print(f"  Database connect failed ({e!r}), retrying")
+                await asyncio.sleep(random.uniform(0, backoff_ms) / 1000)
+        
+        elapsed_ms = (time.monotonic() - started) * 1000
+        self.connect_stats["connects"] += 1
+        if elapsed_ms >= settings.db_wakeup_threshold_ms:
+            self.connect_stats["wakeups"] += 1
+            self.connect_stats["max_wakeup_ms"] = max(self.connect_stats["max_wakeup_ms"], elapsed_ms)
+            if request_deadline.get() is not None:
+                self.connect_stats["request_wakeups"] += 1
+                self.connect_stats["request_wakeup_ms"] += elapsed_ms
+        return connection
+    
+    async def open_connection(self) -> asyncpg.Connection:
+        """A standalone connection with the pool's options and wake-up retries; caller closes it"""
+        args, kwargs = self._connect_args()
+        return await self._open_connection(*args, **kwargs, **self._connection_options())
+    
+    async def wake(self):
+        """
+        Make sure the compute is up and the pool has a live connection.
+        Concurrent callers share one wake-up; runs outside any request deadline.
+        """
+        if self._wake_task is None or self._wake_task.done():
+            self._wake_task = asyncio.create_task(self._wake(), context=contextvars.Context())
+        await asyncio.shield(self._wake_task)
+    
+    async def _wake(self):
+        await self.fetch_val("SELECT 1")
     
     async def disconnect(self):
         """Close database connection pool"""
@@ -51,32 +221,130 @@ class DataBridge:
             print("  Database pool disconnected")
     
     @asynccontextmanager
-    async def get_connection(self):
+    async def get_connection(self, timeout: Optional[float] = None):
         """Get a database connection from the pool"""
         if self.pool is None:
             await self.connect()
         
-        async with self.pool.acquire() as connection:
+        ticket = next(self._acquire_tickets)
+        self._acquire_waiters[ticket] = time.monotonic()
+        try:
+            connection = await self.pool.acquire(timeout=timeout)
+        finally:
+            del self._acquire_waiters[ticket]
+        
+        try:
             yield connection
+        finally:
+            await self.pool.release(connection)
+    
+    @property
+    def acquire_queue_depth(self) -> int:
+        """Number of callers currently waiting for a pooled connection"""
+        return len(self._acquire_waiters)
+    
+    @property
+    def acquire_wait_ms(self) -> float:
+        """How long the oldest waiting caller has been blocked on the pool, in milliseconds"""
+        if not self._acquire_waiters:
+            return 0.0
+        return (time.monotonic() - min(self._acquire_waiters.values())) * 1000
+    
+    def pool_stats(self) -> dict:
+        """Snapshot of pool saturation, used by admission control and readiness checks"""
+        return {
+            "size": self.pool.get_size() if self.pool else 0,
+            "idle": self.pool.get_idle_size() if self.pool else 0,
+            "max_size": self.pool.get_max_size() if self.pool else 0,
+            "waiting": self.acquire_queue_depth,
+            "oldest_wait_ms": round(self.acquire_wait_ms, 1),
+        }
+    
+    async def _run(self, method: str, query: str, args: tuple):
+        """
+        Run a query under the current request deadline.
+        The remaining budget becomes the asyncpg timeout; if the calling task is
+        cancelled (client disconnected), asyncpg cancels the query server-side.
+        """
+        async with self.get_connection(timeout=remaining_deadline()) as conn:
+            timeout = remaining_deadline()
+            started = time.monotonic()
+            try:
+                result = await getattr(conn, method)(query, *args, timeout=timeout)
+                self.last_query_at = time.monotonic()
+                return result
+            except asyncio.TimeoutError:
+                self.query_stats["timed_out"] += 1
+                raise
+            except asyncio.CancelledError:
+                now = time.monotonic()
+                deadline = request_deadline.get()
+                self.query_stats["cancelled"] += 1
+                self.query_stats["cancelled_ms"] += (now - started) * 1000
+                if deadline is not None and deadline > now:
+                    self.query_stats["reclaimed_ms"] += (deadline - now) * 1000
+                raise
+    
+    async def gather_in_snapshot(self, *statements: tuple[str, str, tuple]) -> list:
+        """
+        Run independent read statements concurrently, each on its own pooled connection,
+        all seeing the same snapshot.
+        Each statement is (method, query, args) with method one of fetch_all, fetch_one, fetch_val.
+        The first runs in a REPEATABLE READ transaction that exports its snapshot; the
+        others import it with SET TRANSACTION SNAPSHOT.
+        At most SNAPSHOT_GATHER_WIDTH statements; further callers queue for a slot.
+        """
+        if len(statements) > SNAPSHOT_GATHER_WIDTH:
+            raise ValueError(f"gather_in_snapshot runs at most {SNAPSHOT_GATHER_WIDTH} statements")
+        methods = {"fetch_all": "fetch", "fetch_one": "fetchrow", "fetch_val": "fetchval"}
+        
+        async def run(conn, method: str, query: str, args: tuple):
+            result = await getattr(conn, methods[method])(query, *args, timeout=remaining_deadline())
+            if method == "fetch_all":
+                return [dict(row) for row in result]
+            if method == "fetch_one":
+                return dict(result) if result else None
+            return result
+        
+        async def run_in_snapshot(snapshot: str, method: str, query: str, args: tuple):
+            async with self.get_connection(timeout=remaining_deadline()) as conn:
+                async with conn.transaction(isolation="repeatable_read", readonly=True):
+                    await conn.execute(f"SET TRANSACTION SNAPSHOT '{snapshot}'")
+                    return await run(conn, method, query, args)
+        
+        (first_method, first_query, first_args), *others = statements
+        async with self._snapshot_slots:
+            async with self.get_connection(timeout=remaining_deadline()) as leader:
+                async with leader.transaction(isolation="repeatable_read", readonly=True):
+                    snapshot = await leader.fetchval("SELECT pg_export_snapshot()")
+                    return await asyncio.gather(
+                        run(leader, first_method, first_query, first_args),
+                        *(run_in_snapshot(snapshot, *statement) for statement in others)
+                    )
     
     async def execute(self, query: str, *args) -> str:
         """Execute a query that doesn't return data (INSERT, UPDATE, DELETE)"""
-        async with self.get_connection() as conn:
-            return await conn.execute(query, *args)
+        return await self._run("execute", query, args)
     
     async def fetch_one(self, query: str, *args) -> Optional[dict]:
         """Fetch a single row"""
-        async with self.get_connection() as conn:
-            row = await conn.fetchrow(query, *args)
-            return dict(row) if row else None
+        row = await self._run("fetchrow", query, args)
+        return dict(row) if row else None
     
     async def fetch_all(self, query: str, *args) -> list[dict]:
         """Fetch multiple rows"""
-        async with self.get_connection() as conn:
-            rows = await conn.fetch(query, *args)
-            return [dict(row) for row in rows]
+        rows = await self._run("fetch", query, args)
+        return [dict(row) for row in rows]
     
     async def fetch_val(self, query: str, *args) -> Any:
         """Fetch a single value"""
-        async with self.get_connection() as conn:
-            return await conn.fetchval(query, *args)
+        return await self._run("fetchval", query, args)
+    
+    async def estimate_count(self, table: str) -> Optional[int]:
+        """
+        Planner row estimate for a table from pg_class.reltuples, summed over the leaf
+        partitions when the table is partitioned (autovacuum never analyzes the parent).
+        Returns None when there is no usable estimate (table never analyzed, or empty).
+        """
+        estimate = await self.fetch_val(ESTIMATE_COUNT, table)
+        return estimate if estimate and estimate > 0 else None
@@ -3,7 +3,9 @@ Database initialization script for the hackathon project.
 Creates the necessary tables for users and projects.
 """
 import asyncio
-from dependencies import get_databridge
+from dependencies import get_databridge, get_shard_router
+from database.shards import init_shards
+from database.partitions import create_partitioned_projects, ensure_archive_partitions, is_partitioned
 
 
 async def init_database():
@@ -28,19 +30,53 @@ async def init_database():
         """)
         print("✓ Users table created/verified")
         
-        # Create projects table
+        # Tombstone column for background deletion
         await db.execute("""
-            CREATE TABLE IF NOT EXISTS projects (
-                id SERIAL PRIMARY KEY,
-                name VARCHAR(100) NOT NULL,
-                description TEXT,
-                owner_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
-                status VARCHAR(20) DEFAULT 'active',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            ALTER TABLE users ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMP;
+        """)
+        
+        # Create projects table, partitioned by status so archived history stays out of active queries
+        if await db.fetch_val("SELECT to_regclass('projects') IS NULL"):
+            await create_partitioned_projects(db)
+            await ensure_archive_partitions(db)
+            print("✓ Projects table created (partitioned by status)")
+        elif await is_partitioned(db):
+            await ensure_archive_partitions(db)
+            print("✓ Projects table and archive partitions verified")
+        else:
+            print("✓ Projects table verified (unpartitioned: run `python -m database.partitions migrate`)")
+        
+        # Create user deletion progress table (no FK: rows outlive the deleted user)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS user_deletions (
+                user_id INTEGER PRIMARY KEY,
+                status VARCHAR(20) NOT NULL DEFAULT 'pending',
+                projects_total INTEGER NOT NULL DEFAULT 0,
+                projects_deleted INTEGER NOT NULL DEFAULT 0,
+                requested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                completed_at TIMESTAMP
             );
         """)
-        print("✓ Projects table created/verified")
+        print("✓ User deletions table created/verified")
+        
+        # Create the append-only project activity log (no FK: events outlive deleted projects).
+        # Rows arrive in time order, so a BRIN index on occurred_at stays tiny at any size.
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS project_events (
+                occurred_at TIMESTAMP NOT NULL,
+                project_id INTEGER NOT NULL,
+                event_type VARCHAR(20) NOT NULL,
+                owner_id INTEGER,
+                changes JSONB
+            );
+        """)
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_project_events_occurred_at ON project_events USING BRIN (occurred_at);
+        """)
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_project_events_project ON project_events(project_id, occurred_at);
+        """)
+        print("✓ Project events table created/verified")
         
         # Create indexes for better performance
         await db.execute("""
@@ -49,17 +85,43 @@ async def init_database():
         await db.execute("""
             CREATE INDEX IF NOT EXISTS idx_users_username ON users(username);
         """)
+        
+        # Trigram indexes for user search (prefix LIKE and fuzzy %, <% matching)
+        await db.execute("""
+            CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        """)
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_users_username_trgm ON users USING GIN (lower(username) gin_trgm_ops);
+        """)
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_users_email_trgm ON users USING GIN (lower(email) gin_trgm_ops);
+        """)
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_users_full_name_trgm ON users USING GIN (lower(full_name) gin_trgm_ops);
+        """)
+        # Ordered prefix scans for one- and two-character queries
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_users_username_prefix ON users ((lower(username) COLLATE "C"));
+        """)
         await db.execute("""
             CREATE INDEX IF NOT EXISTS idx_projects_owner ON projects(owner_id);
         """)
         await db.execute("""
             CREATE INDEX IF NOT EXISTS idx_projects_status ON projects(status);
         """)
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_projects_created_at ON projects(created_at);
+        """)
         print("✓ Database indexes created/verified")
         
+        # Create the shard directory and per-shard projects tables when sharding is enabled
+        shards = get_shard_router()
+        if shards:
+            await init_shards(db, shards)
+        
         # Insert some sample data (optional)
-        existing_users = await db.fetch_val("SELECT COUNT(*) FROM users")
-        if existing_users == 0:
+        has_users = await db.fetch_val("SELECT EXISTS (SELECT 1 FROM users)")
+        if not has_users:
             await db.execute("""
                 INSERT INTO users (username, email, full_name) VALUES 
                 ('john_doe', 'john@example.com', 'John Doe'),
@@ -77,6 +139,8 @@ async def init_database():
             print("✓ Database already contains data, skipping sample data insertion")
         
         await db.disconnect()
+        if shards:
+            await shards.disconnect()
         print("🎉 Database initialization completed successfully!")
         
     except Exception as e:
@@ -0,0 +1,81 @@
+"""
+Keep a serverless Postgres compute (Neon) awake during scheduled hours.
+Neon suspends compute after a few idle minutes, and the next query pays for the
+wake-up. During the configured windows a trivial query runs often enough that
+the compute never goes idle; outside them it is allowed to suspend.
+
+DB_KEEPALIVE_SCHEDULE examples:
+    always
+    mon-fri 08:00-18:00
+    mon-fri 08:00-18:00; sat 10:00-14:00
+"""
+import asyncio
+from datetime import datetime, time
+from typing import Optional
+from zoneinfo import ZoneInfo
+from database.databridge import DataBridge
+
+
+DAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+# (weekdays, start, end) with weekdays as datetime.weekday() numbers
+Window = tuple[frozenset[int], time, time]
+
+
+def _parse_days(spec: str) -> frozenset[int]:
+    """'mon-fri', 'sat' or 'mon,wed,fri' as weekday numbers; ranges may wrap (fri-mon)"""
+    days = set()
+    for part in spec.split(","):
+        first, _, last = part.partition("-")
+        start, end = DAYS.index(first), DAYS.index(last or first)
+        days.update((start + i) % 7 for i in range((end - start) % 7 + 1))
+    return frozenset(days)
+
+
+def parse_schedule(spec: str) -> list[Window]:
+    """Parse 'always' or '<days> HH:MM-HH:MM' windows separated by ';'"""
+    spec = spec.strip().lower()
+    if not spec:
+        return []
+    if spec == "always":
+        return [(frozenset(range(7)), time.min, time.max)]
+
+    windows = []
+    for window in spec.split(";"):
+        try:
+            days, hours = window.split()
+            start, end = (time.fromisoformat(hour) for hour in hours.split("-"))
+            windows.append((_parse_days(days), start, end))
+        except ValueError:
+            raise ValueError(f"Invalid DB_KEEPALIVE_SCHEDULE window: {window.strip()!r}")
+    return windows
+
+
+def in_schedule(windows: list[Window], now: datetime) -> bool:
+    """Whether `now` falls inside any window; windows ending before they start wrap past midnight"""
+    for days, start, end in windows:
+        current = now.time()
+        if start <= end:
+            if now.weekday() in days and start <= current < end:
+                return True
+        elif (now.weekday() in days and current >= start) or ((now.weekday() - 1) % 7 in days and current < end):
+            return True
+    return False
+
+
+async def keepalive_loop(
+    db: DataBridge,
+    schedule: str,
+    interval_seconds: float,
+    timezone: Optional[str] = None
+):
+    """Ping the database every interval_seconds while inside the schedule"""
+    windows = parse_schedule(schedule)
+    zone = ZoneInfo(timezone) if timezone else None
+    while True:
+        if in_schedule(windows, datetime.now(zone)):
+            try:
+                await db.wake()
+            except Exception as e:
+                print(f"❌ Database keepalive failed: {e}")
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,192 @@
+"""
+Declarative partitioning of the projects table.
+Projects are LIST-partitioned by status so queries for active work never touch
+archived history. The archived partition is a cold tier, RANGE-partitioned by year
+of created_at and optionally placed on its own tablespace.
+
+Usage:
+    python -m database.partitions migrate   # convert an existing unpartitioned table
+    python -m database.partitions ensure    # create upcoming archive partitions
+    python -m database.partitions check     # verify no project id is used twice
+"""
+import asyncio
+import sys
+from datetime import datetime
+from database.databridge import DataBridge
+from dependencies import get_databridge
+from settings import get_settings
+
+
+# How many years of archive partitions to keep created ahead of time
+ARCHIVE_YEARS_AHEAD = 1
+
+
+def _tablespace_clause() -> str:
+    tablespace = get_settings().db_archive_tablespace
+    return f" TABLESPACE {tablespace}" if tablespace else ""
+
+
+async def is_partitioned(db: DataBridge) -> bool:
+    """Whether projects is already a partitioned table"""
+    # relkind is a "char", which asyncpg returns as bytes; compare it as text
+    kind = await db.fetch_val("SELECT relkind::text FROM pg_class WHERE oid = to_regclass('projects')")
+    return kind == "p"
+
+
+async def create_partitioned_projects(db, table: str = "projects"):
+    """
+    Create the partitioned projects table and its fixed partitions.
+    `db` is a DataBridge or an asyncpg connection (both have execute()).
+    """
+    # Postgres requires every partition key in the primary key, so nothing in the
+    # database enforces a unique id. Defaults come from one shared sequence; writers
+    # that set ids explicitly must call check_unique_ids.
+    await db.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            id SERIAL,
+            name VARCHAR(100) NOT NULL,
+            description TEXT,
+            owner_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+            status VARCHAR(20) NOT NULL DEFAULT 'active',
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (id, status, created_at)
+        ) PARTITION BY LIST (status);
+    """)
+    await db.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table}_active PARTITION OF {table} FOR VALUES IN ('active');
+    """)
+    await db.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table}_completed PARTITION OF {table} FOR VALUES IN ('completed');
+    """)
+    await db.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table}_archived PARTITION OF {table} FOR VALUES IN ('archived')
+        PARTITION BY RANGE (created_at){_tablespace_clause()};
+    """)
+    await db.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table}_archived_default PARTITION OF {table}_archived DEFAULT{_tablespace_clause()};
+    """)
+    await db.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table}_other PARTITION OF {table} DEFAULT;
+    """)
+
+
+async def create_archive_partition(db, year: int, table: str = "projects"):
+    """Create the archive partition for one year of created_at"""
+    await db.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table}_archived_{year} PARTITION OF {table}_archived
+        FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01'){_tablespace_clause()};
+    """)
+
+
+async def ensure_archive_partitions(db, table: str = "projects"):
+    """Create this year's archive partition and the next ARCHIVE_YEARS_AHEAD"""
+    this_year = datetime.now().year
+    for year in range(this_year, this_year + ARCHIVE_YEARS_AHEAD + 1):
+        await create_archive_partition(db, year, table)
+
+
+async def check_unique_ids(db, table: str = "projects"):
+    """
+    Fail with a unique_violation if any project id is used more than once.
+    The primary key is (id, status, created_at), so Postgres itself accepts a duplicate
+    id in another partition or with another created_at. Runs through execute() so it
+    works on a DataBridge or inside a connection's transaction.
+    """
+    await db.execute(f"""
+        DO $$
+        DECLARE duplicate integer;
+        BEGIN
+            SELECT id INTO duplicate FROM {table} GROUP BY id HAVING COUNT(*) > 1 LIMIT 1;
+            IF FOUND THEN
+                RAISE EXCEPTION 'Project id % is used more than once in {table}', duplicate
+                    USING ERRCODE = 'unique_violation';
+            END IF;
+        END $$;
+    """)
+
+
+async def partition_maintenance_loop(db: DataBridge, interval_hours: float):
+    """Keep archive partitions created ahead of time while the app runs"""
+    while True:
+        try:
+            if await is_partitioned(db):
+                await ensure_archive_partitions(db)
+        except Exception as e:
+            print(f"❌ Partition maintenance failed: {e}")
+        await asyncio.sleep(interval_hours * 3600)
+
+
+async def migrate_projects(db: DataBridge):
+    """
+    Convert an existing unpartitioned projects table in place.
+    Everything runs in one transaction, so the table is locked while rows are copied.
+    """
+    if await is_partitioned(db):
+        print("✓ Projects table is already partitioned")
+        return
+
+    async with db.get_connection() as conn:
+        async with conn.transaction():
+            await conn.execute("LOCK TABLE projects IN ACCESS EXCLUSIVE MODE")
+            await conn.execute("ALTER TABLE projects RENAME TO projects_unpartitioned")
+            await conn.execute("ALTER SEQUENCE projects_id_seq OWNED BY NONE")
+
+            await create_partitioned_projects(conn)
+            years = await conn.fetch("""
+                SELECT DISTINCT EXTRACT(YEAR FROM created_at)::int AS year
+                FROM projects_unpartitioned WHERE status = 'archived' AND created_at IS NOT NULL
+            """)
+            for row in years:
+                await create_archive_partition(conn, row['year'])
+            await ensure_archive_partitions(conn)
+
+            # The new table created its own sequence; keep using the old one so IDs continue
+            new_sequence = await conn.fetchval("SELECT pg_get_serial_sequence('projects', 'id')")
+            await conn.execute("""
+                ALTER TABLE projects ALTER COLUMN id SET DEFAULT nextval('projects_id_seq')
+            """)
+            await conn.execute(f"DROP SEQUENCE IF EXISTS {new_sequence}")
+            await conn.execute("ALTER SEQUENCE projects_id_seq OWNED BY projects.id")
+
+            copied = await conn.execute("""
+                INSERT INTO projects (id, name, description, owner_id, status, created_at, updated_at)
+                SELECT id, name, description, owner_id, COALESCE(status, 'active'),
+                       COALESCE(created_at, updated_at, CURRENT_TIMESTAMP), updated_at
+                FROM projects_unpartitioned
+            """)
+            await check_unique_ids(conn)
+            await conn.execute("DROP TABLE projects_unpartitioned")
+    print(f"✓ Migrated projects to partitioned table ({copied.split()[-1]} rows)")
+
+
+async def create_partition_indexes(db: DataBridge, table: str = "projects"):
+    """Partitioned indexes, created on every partition automatically"""
+    await db.execute(f"""
+        CREATE INDEX IF NOT EXISTS idx_{table}_owner ON {table}(owner_id);
+    """)
+    await db.execute(f"""
+        CREATE INDEX IF NOT EXISTS idx_{table}_created_at ON {table}(created_at);
+    """)
+
+
+async def main(command: str):
+    db = get_databridge()
+    try:
+        if command == "migrate":
+            await migrate_projects(db)
+            await create_partition_indexes(db)
+        elif command == "ensure":
+            await ensure_archive_partitions(db)
+            print("✓ Archive partitions created/verified")
+        elif command == "check":
+            await check_unique_ids(db)
+            print("✓ Project ids are unique")
+        else:
+            raise SystemExit(f"Unknown command: {command}")
+    finally:
+        await db.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else "ensure"))
@@ -0,0 +1,339 @@
+"""
+Compiled SQL statements shared by the services.
+Dynamic statements are generated once per combination of columns and cached, so the
+query text is stable and asyncpg's per-connection prepared statement cache is reused.
+Writes return the joined response shape in a single statement.
+"""
+from functools import lru_cache
+
+
+PROJECT_COLUMNS = "id, name, description, status, owner_id, created_at, updated_at"
+
+USER_COLUMNS = "id, username, email, full_name, created_at, updated_at"
+
+# Projects joined to their owner's name, the shape every project response is built from
+PROJECT_SELECT = """
+SELECT p.id, p.name, p.description, p.status, p.owner_id,
+       p.created_at, p.updated_at, u.full_name AS owner_name
+FROM projects p
+LEFT JOIN users u ON p.owner_id = u.id
+"""
+
+
+def _filters(columns: tuple[str, ...], alias: str = "") -> list[str]:
+    """Literal "column = $n" predicates, numbered from $1"""
+    return [f"{alias}{column} = ${i}" for i, column in enumerate(columns, start=1)]
+
+
+@lru_cache(maxsize=None)
+def project_list(filters: tuple[str, ...]) -> str:
+    """
+    Project list filtered on the given columns (owner_id, status), newest first.
+    Each filter is a plain predicate rather than "$1 IS NULL OR ...", so the planner
+    can use indexes and prune status partitions.
+    """
+    where = " AND ".join(_filters(filters, "p.") + ["u.deleted_at IS NULL"])
+    return f"""
+    {PROJECT_SELECT}
+    WHERE {where}
+    ORDER BY p.created_at DESC
+    """
+
+
+@lru_cache(maxsize=None)
+def project_count(filters: tuple[str, ...]) -> str:
+    """COUNT(*) over projects filtered like project_list"""
+    where = " AND ".join(_filters(filters, "p.") + ["u.deleted_at IS NULL"])
+    return f"""
+    SELECT COUNT(*)
+    FROM projects p
+    LEFT JOIN users u ON p.owner_id = u.id
+    WHERE {where}
+    """
+
+
+PROJECT_DELETE = "DELETE FROM projects WHERE id = $1 RETURNING owner_id"
+
+# Per-status totals for the dashboard, hiding projects of tombstoned owners
+PROJECT_STATUS_COUNTS = """
+SELECT p.status, COUNT(*) AS count
+FROM projects p
+LEFT JOIN users u ON p.owner_id = u.id
+WHERE u.deleted_at IS NULL
+GROUP BY p.status
+"""
+
+# Background user deletion: one bounded batch of the owner's projects. Rows another
+# purge of the same user has locked are skipped, so concurrent purges split the work.
+# Parameters: the user ID, the batch size.
+PROJECT_DELETE_BATCH = """
+WITH batch AS (
+    DELETE FROM projects
+    WHERE id IN (SELECT id FROM projects WHERE owner_id = $1 LIMIT $2 FOR UPDATE SKIP LOCKED)
+    RETURNING 1
+)
+"""
+
+# Same database: delete a batch and record the progress in one statement
+USER_PURGE_BATCH = f"""
+{PROJECT_DELETE_BATCH}
+UPDATE user_deletions
+SET status = 'running', projects_deleted = projects_deleted + (SELECT COUNT(*) FROM batch)
+WHERE user_id = $1
+RETURNING (SELECT COUNT(*) FROM batch)
+"""
+
+
+# Remove the tombstoned user once no projects are left, so the FK cascade has nothing to do
+USER_PURGE_DELETE = """
+DELETE FROM users
+WHERE id = $1 AND deleted_at IS NOT NULL
+  AND NOT EXISTS (SELECT 1 FROM projects WHERE owner_id = $1)
+"""
+
+
+# Database-side JSON rendering. Each value is rendered with to_json() and the objects are
+# concatenated by hand, because json_build_object/json_agg emit '"key" : value' spacing
+# and trim fractional seconds; the result is byte-identical to Starlette's JSONResponse
+# (compact separators, non-ASCII unescaped) rendering the same response models.
+
+def _iso(column: str) -> str:
+    """datetime.isoformat() of a timestamp column, now when it is NULL"""
+    value = f"COALESCE({column}, LOCALTIMESTAMP)"
+    return f"""
+    CASE WHEN date_trunc('second', {value}) = {value}
+         THEN to_char({value}, 'YYYY-MM-DD"T"HH24:MI:SS')
+         ELSE to_char({value}, 'YYYY-MM-DD"T"HH24:MI:SS.US') END"""
+
+
+def _json_object(fields: dict[str, str]) -> str:
+    """Text expression for one compact JSON object; each field maps to JSON text or NULL"""
+    parts = [
+        f"""'{"," if i else "{"}"{key}":' || COALESCE({value}, 'null')"""
+        for i, (key, value) in enumerate(fields.items())
+    ]
+    return " || ".join(parts) + " || '}'"
+
+
+def _json_array(item: str, order_by: str) -> str:
+    """Aggregate of `item` objects into a JSON array, '[]' when there are no rows"""
+    return f"'[' || COALESCE(string_agg({item}, ',' ORDER BY {order_by}), '') || ']'"
+
+
+# ProjectResponse, in field order, as project_from_row builds it
+PROJECT_JSON = _json_object({
+    "id": "p.id::text",
+    "name": "to_json(p.name)::text",
+    "description": "to_json(p.description)::text",
+    "status": "to_json(p.status)::text",
+    "owner_id": "p.owner_id::text",
+    "owner_name": "to_json(COALESCE(NULLIF(u.full_name, ''), 'Unknown'))::text",
+    "created_at": f"to_json({_iso('p.created_at')})::text",
+    "updated_at": f"to_json({_iso('p.updated_at')})::text",
+})
+
+# UserResponse, in field order, as user_from_row builds it
+USER_JSON = _json_object({
+    "id": "id::text",
+    "email": "to_json(email)::text",
+    "name": "to_json(COALESCE(NULLIF(full_name, ''), username))::text",
+    "role": "'\"user\"'",
+    "is_active": "'true'",
+    "created_at": f"to_json({_iso('created_at')})::text",
+})
+
+USER_LIST_JSON = f"""
+SELECT {_json_array(USER_JSON, "created_at DESC")}
+FROM users
+WHERE deleted_at IS NULL
+"""
+
+
+@lru_cache(maxsize=None)
+def project_list_json(filters: tuple[str, ...]) -> str:
+    """Same parameters and order as project_list, returning the whole response body as text"""
+    where = " AND ".join(_filters(filters, "p.") + ["u.deleted_at IS NULL"])
+    return f"""
+    SELECT {_json_array(PROJECT_JSON, "p.created_at DESC")}
+    FROM projects p
+    LEFT JOIN users u ON p.owner_id = u.id
+    WHERE {where}
+    """
+
+
+def _with_owner_name(write: str) -> str:
+    """Wrap a projects write ... RETURNING in a CTE joined to the owner's name"""
+    return f"""
+    WITH p AS (
+        {write}
+        RETURNING {PROJECT_COLUMNS}
+    )
+    SELECT p.id, p.name, p.description, p.status, p.owner_id,
+           p.created_at, p.updated_at, u.full_name AS owner_name
+    FROM p
+    LEFT JOIN users u ON p.owner_id = u.id
+    """
+
+
+def _set_clause(columns: tuple[str, ...]) -> str:
+    """SET clause for the given columns plus updated_at, numbered from $1"""
+    assignments = [f"{column} = ${i}" for i, column in enumerate(columns, start=1)]
+    assignments.append(f"updated_at = ${len(columns) + 1}")
+    return ", ".join(assignments)
+
+
+PROJECT_INSERT = _with_owner_name("""
+        INSERT INTO projects (name, description, status, owner_id, created_at, updated_at)
+        VALUES ($1, $2, $3, $4, $5, $6)""")
+
+
+# Group-committed inserts: one row per array element. IDs come from the sequence in
+# input order, so ORDER BY p.id lines results up with the inputs.
+PROJECT_INSERT_MANY = _with_owner_name("""
+        INSERT INTO projects (name, description, status, owner_id, created_at, updated_at)
+        SELECT * FROM unnest($1::text[], $2::text[], $3::text[], $4::int[],
+                             $5::timestamp[], $6::timestamp[])""") + "ORDER BY p.id"
+
+
+@lru_cache(maxsize=None)
+def project_update(columns: tuple[str, ...]) -> str:
+    """
+    UPDATE for the given project columns, returning the joined response row.
+    Parameters: one per column, then updated_at, then the project ID.
+    """
+    return _with_owner_name(f"""
+        UPDATE projects
+        SET {_set_clause(columns)}
+        WHERE id = ${len(columns) + 2}""")
+
+
+# Bulk update selectors: ProjectBulkUpdate field -> predicate, numbered with format()
+BULK_SELECTORS = {
+    "ids": "id = ANY(${}::int[])",
+    "owner_id": "owner_id = ${}",
+    "status": "status = ${}",
+    "created_after": "created_at >= ${}",
+    "created_before": "created_at < ${}",
+}
+
+
+@lru_cache(maxsize=None)
+def project_bulk_ids(selectors: tuple[str, ...]) -> str:
+    """
+    IDs and owners of the projects matching the given selectors, locked for update.
+    Parameters: one per selector, then the row limit.
+    """
+    where = " AND ".join(
+        BULK_SELECTORS[selector].format(i) for i, selector in enumerate(selectors, start=1)
+    )
+    return f"SELECT id, owner_id FROM projects WHERE {where} LIMIT ${len(selectors) + 1} FOR UPDATE"
+
+
+@lru_cache(maxsize=None)
+def project_bulk_update(columns: tuple[str, ...], returning: bool) -> str:
+    """
+    One set-based UPDATE of the given columns over an array of project IDs,
+    returning the joined response rows only when asked to.
+    Parameters: one per column, then updated_at, then the ID array.
+    """
+    write = f"""
+        UPDATE projects
+        SET {_set_clause(columns)}
+        WHERE id = ANY(${len(columns) + 2}::int[])"""
+    return _with_owner_name(write) if returning else write
+
+
+# Sharded mode: projects live on shards without the users table, so no owner join
+SHARD_PROJECT_SELECT = f"SELECT {PROJECT_COLUMNS} FROM projects"
+
+SHARD_PROJECT_INSERT = f"""
+INSERT INTO projects (name, description, status, owner_id, created_at, updated_at)
+VALUES ($1, $2, $3, $4, $5, $6)
+RETURNING {PROJECT_COLUMNS}
+"""
+
+
+@lru_cache(maxsize=None)
+def shard_project_list(filters: tuple[str, ...]) -> str:
+    """Same parameters as project_list, without the owner join"""
+    where = f"WHERE {' AND '.join(_filters(filters))}" if filters else ""
+    return f"{SHARD_PROJECT_SELECT} {where} ORDER BY created_at DESC NULLS LAST"
+
+
+@lru_cache(maxsize=None)
+def shard_project_count(filters: tuple[str, ...]) -> str:
+    """Same parameters as project_count, without the owner join"""
+    where = f"WHERE {' AND '.join(_filters(filters))}" if filters else ""
+    return f"SELECT COUNT(*) FROM projects {where}"
+
+
+@lru_cache(maxsize=None)
+def shard_project_update(columns: tuple[str, ...]) -> str:
+    """Same parameters as project_update, without the owner join"""
+    return f"""
+    UPDATE projects
+    SET {_set_clause(columns)}
+    WHERE id = ${len(columns) + 2}
+    RETURNING {PROJECT_COLUMNS}
+    """
+
+
+@lru_cache(maxsize=None)
+def shard_project_bulk_update(columns: tuple[str, ...]) -> str:
+    """Same parameters as project_bulk_update, without the owner join"""
+    return f"""
+    UPDATE projects
+    SET {_set_clause(columns)}
+    WHERE id = ANY(${len(columns) + 2}::int[])
+    RETURNING {PROJECT_COLUMNS}
+    """
+
+
+USER_INSERT = f"""
+INSERT INTO users (username, email, full_name, created_at, updated_at)
+VALUES ($1, $2, $3, $4, $5)
+RETURNING {USER_COLUMNS}
+"""
+
+
+@lru_cache(maxsize=None)
+def user_update(columns: tuple[str, ...]) -> str:
+    """
+    UPDATE for the given user columns.
+    Parameters: one per column, then updated_at, then the user ID.
+    """
+    return f"""
+    UPDATE users
+    SET {_set_clause(columns)}
+    WHERE id = ${len(columns) + 2}
+    RETURNING {USER_COLUMNS}
+    """
+
+
+# User search: pg_trgm GIN indexes serve the prefix (LIKE) and fuzzy (%, <%) predicates.
+# Parameters: the lowercased query, the escaped LIKE prefix pattern, the limit.
+USER_SEARCH = f"""
+SELECT {USER_COLUMNS}
+FROM users
+WHERE deleted_at IS NULL
+  AND (lower(username) LIKE $2 OR lower(email) LIKE $2 OR lower(full_name) LIKE $2
+       OR lower(username) % $1 OR lower(email) % $1 OR $1 <% lower(full_name))
+ORDER BY (lower(username) LIKE $2 OR lower(email) LIKE $2 OR lower(full_name) LIKE $2) DESC,
+         GREATEST(similarity(lower(username), $1),
+                  similarity(lower(email), $1),
+                  word_similarity($1, lower(full_name))) DESC,
+         username
+LIMIT $3
+"""
+
+# Queries too short to have trigrams: walk the C-collated username index between
+# the prefix and its successor, so the plan stays an index range scan with bound parameters.
+# Parameters: lower bound, upper bound, limit.
+USER_PREFIX_SEARCH = f"""
+SELECT {USER_COLUMNS}
+FROM users
+WHERE lower(username) COLLATE "C" >= $1 AND lower(username) COLLATE "C" < $2
+  AND deleted_at IS NULL
+ORDER BY lower(username) COLLATE "C"
+LIMIT $3
+"""
@@ -0,0 +1,133 @@
+"""
+Move one owner's projects to another shard while the API keeps serving traffic.
+
+Usage:
+    python -m database.rebalance <owner_id> <target_shard_id>
+
+Steps:
+1. Copy the owner's projects to the target shard in batches (idempotent upserts).
+2. Point the owner at the target in owner_shards.
+3. Wait for every worker to reload its overrides (DB_SHARD_OVERRIDE_TTL_SECONDS).
+4. Re-copy rows written to the source during the move, and drop rows deleted there.
+5. Delete the owner's projects from the source in batches.
+
+Rows written through a worker that already routes to the target are never overwritten
+by older source rows. A row deleted on the target during step 3 can come back if it was
+also modified on the source in that window, so keep the window short.
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+from database.databridge import DataBridge
+from database.queries import PROJECT_COLUMNS
+from database.shards import ShardRouter
+from dependencies import get_databridge
+from settings import get_settings
+
+
+BATCH_SIZE = 1000
+
+# Allowance for clock differences between workers when comparing updated_at
+CLOCK_SKEW = timedelta(seconds=60)
+
+UPSERT_QUERY = f"""
+INSERT INTO projects ({PROJECT_COLUMNS})
+VALUES ($1, $2, $3, $4, $5, $6, $7)
+ON CONFLICT (id) DO UPDATE SET
+    name = EXCLUDED.name,
+    description = EXCLUDED.description,
+    status = EXCLUDED.status,
+    owner_id = EXCLUDED.owner_id,
+    updated_at = EXCLUDED.updated_at
+WHERE projects.updated_at < EXCLUDED.updated_at
+"""
+
+
+async def copy_rows(target: DataBridge, rows: list[dict]):
+    """Upsert rows on the target shard, keeping whichever copy is newer"""
+    if not rows:
+        return
+    async with target.get_connection() as conn:
+        await conn.executemany(UPSERT_QUERY, [tuple(row.values()) for row in rows])
+
+
+async def rebalance_owner(owner_id: int, target_shard_id: int):
+    """Move all of an owner's projects to target_shard_id"""
+    settings = get_settings()
+    directory = get_databridge()
+    router = ShardRouter(directory)
+    if target_shard_id not in router.shards:
+        raise ValueError(f"Unknown shard {target_shard_id}")
+
+    source_shard_id = await router.shard_id_for_owner(owner_id)
+    if source_shard_id == target_shard_id:
+        print(f"✓ Owner {owner_id} is already on shard {target_shard_id}")
+        return
+    source, target = router.shards[source_shard_id], router.shards[target_shard_id]
+    print(f"🚚 Moving owner {owner_id} from shard {source_shard_id} to shard {target_shard_id}")
+
+    try:
+        # 1. Bulk copy
+        copy_started = datetime.now() - CLOCK_SKEW
+        copied, last_id = 0, 0
+        while True:
+            rows = await source.fetch_all(
+                f"SELECT {PROJECT_COLUMNS} FROM projects WHERE owner_id = $1 AND id > $2 ORDER BY id LIMIT $3",
+                owner_id, last_id, BATCH_SIZE
+            )
+            if not rows:
+                break
+            await copy_rows(target, rows)
+            copied += len(rows)
+            last_id = rows[-1]['id']
+        print(f"✓ Copied {copied} projects")
+
+        # 2. Flip routing
+        await directory.execute(
+            """
+            INSERT INTO owner_shards (owner_id, shard_id, moved_at) VALUES ($1, $2, $3)
+            ON CONFLICT (owner_id) DO UPDATE SET shard_id = EXCLUDED.shard_id, moved_at = EXCLUDED.moved_at
+            """,
+            owner_id, target_shard_id, datetime.now()
+        )
+
+        # 3. Let every worker pick up the new route
+        print(f"⏳ Waiting {settings.db_shard_override_ttl_seconds:.0f}s for workers to reload routes")
+        await asyncio.sleep(settings.db_shard_override_ttl_seconds)
+
+        # 4. Catch up writes that reached the source during the move
+        rows = await source.fetch_all(
+            f"SELECT {PROJECT_COLUMNS} FROM projects WHERE owner_id = $1 AND updated_at >= $2",
+            owner_id, copy_started
+        )
+        await copy_rows(target, rows)
+        source_ids = [
+            row['id'] for row in
+            await source.fetch_all("SELECT id FROM projects WHERE owner_id = $1", owner_id)
+        ]
+        await target.execute(
+            "DELETE FROM projects WHERE owner_id = $1 AND created_at < $2 AND NOT (id = ANY($3::int[]))",
+            owner_id, copy_started, source_ids
+        )
+        print(f"✓ Caught up {len(rows)} projects changed during the move")
+
+        # 5. Remove from the source
+        while True:
+            result = await source.execute(
+                "DELETE FROM projects WHERE id IN (SELECT id FROM projects WHERE owner_id = $1 LIMIT $2)",
+                owner_id, BATCH_SIZE
+            )
+            if int(result.split()[-1]) < BATCH_SIZE:
+                break
+        print(f"🎉 Owner {owner_id} now lives on shard {target_shard_id}")
+    finally:
+        await router.disconnect()
+        await directory.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move an owner's projects to another shard")
+    parser.add_argument("owner_id", type=int)
+    parser.add_argument("target_shard_id", type=int)
+    args = parser.parse_args()
+    asyncio.run(rebalance_owner(args.owner_id, args.target_shard_id))
@@ -0,0 +1,260 @@
+"""
+Generate a large synthetic dataset for benchmarks.
+init_db.py only seeds two users and two projects; this fills the database with
+millions of rows shaped like production data:
+
+- Users sign up steadily over --years; IDs follow signup order.
+- Project ownership is skewed: a few heavy owners, a long tail with one or two projects.
+- Statuses are mostly archived, some active and some completed.
+- Project timestamps fall between the owner's signup and --end.
+- Descriptions are long and of varying length; a few are NULL.
+
+Rows are generated in chunks by worker processes, each chunk from its own
+random.Random(seed, table, chunk), and streamed into Postgres with COPY over
+pooled connections in parallel. The same seed on the same starting database
+produces the same rows, whatever --workers is.
+
+Usage (against a local or scratch database, never production):
+    python -m database.seed --users 1000000 --projects 9000000 [--seed 42] [--workers 8]
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from database.init_db import init_database
+from database.partitions import check_unique_ids, create_archive_partition, is_partitioned
+from dependencies import get_databridge
+
+
+CHUNK_SIZE = 20000
+# COPY source granularity: large enough to keep the connection busy, small enough not to stall it
+STREAM_BYTES = 1 << 20
+
+USER_COLUMNS = ("id", "username", "email", "full_name", "created_at", "updated_at")
+PROJECT_COLUMNS = ("id", "name", "description", "owner_id", "status", "created_at", "updated_at")
+
+# Owner index is users * random() ** OWNER_SKEW, so low IDs own most projects
+OWNER_SKEW = 3
+STATUS_WEIGHTS = (("archived", 0.60), ("active", 0.25), ("completed", 0.15))
+NULL_DESCRIPTION_RATE = 0.05
+# Description length in words: exponential around the mean, clipped
+DESCRIPTION_WORDS_MEAN = 120
+DESCRIPTION_WORDS_MAX = 1000
+
+FIRST_NAMES = [
+    "ada", "alan", "barbara", "charles", "dennis", "edsger", "frances", "grace", "guido", "john",
+    "ken", "linus", "margaret", "niklaus", "radia", "rasmus", "shafi", "tim", "tony", "yukihiro",
+]
+LAST_NAMES = [
+    "allen", "backus", "berners", "dijkstra", "goldwasser", "hamilton", "hoare", "hopper", "kay", "knuth",
+    "lamport", "liskov", "lovelace", "matsumoto", "perlman", "ritchie", "shannon", "thompson", "turing", "wirth",
+]
+DOMAINS = ["example.com", "example.org", "example.net", "mail.example.com"]
+PROJECT_ADJECTIVES = [
+    "agile", "bright", "careful", "daring", "eager", "fast", "gentle", "hidden", "lucid", "nimble",
+    "quiet", "rapid", "silent", "steady", "swift", "tidy", "urgent", "vivid", "wise", "young",
+]
+PROJECT_NOUNS = [
+    "api", "backend", "cache", "dashboard", "engine", "gateway", "index", "ledger", "migration", "pipeline",
+    "platform", "portal", "queue", "report", "scheduler", "search", "service", "tracker", "website", "worker",
+]
+WORDS = (
+    "the project tracks work for a small team and covers planning design review testing release "
+    "support data model api client server database index query cache latency throughput budget "
+    "customer feedback roadmap milestone deadline owner status archive migration rollout metrics "
+    "dashboard report export import sync schedule retry failure recovery backup monitoring alert"
+).split()
+
+
+def _timestamp(value: datetime) -> str:
+    return value.isoformat(sep=" ")
+
+
+def user_signup(start: datetime, span: timedelta, users: int, index: int) -> datetime:
+    """Signup time of the index-th generated user; spread evenly so projects can follow it"""
+    return start + span * index / users
+
+
+def generate_users(chunk: int, first: int, count: int, seed: int, base_id: int, users: int,
+                   start: datetime, end: datetime) -> bytes:
+    """COPY text rows for users first..first+count of the generated set"""
+    rng = random.Random(f"{seed}:users:{chunk}")
+    span = end - start
+    lines = []
+    for index in range(first, first + count):
+        user_id = base_id + 1 + index
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        username = f"{first_name}.{last_name}{user_id}"
+        created_at = user_signup(start, span, users, index)
+        updated_at = created_at + (end - created_at) * rng.random() ** 2
+        lines.append("\t".join((
+            str(user_id),
+            username,
+            f"{username}@{rng.choice(DOMAINS)}",
+            f"{first_name.title()} {last_name.title()}",
+            _timestamp(created_at),
+            _timestamp(updated_at),
+        )))
+    return ("\n".join(lines) + "\n").encode()
+
+
+def _pick_status(rng: random.Random) -> str:
+    roll = rng.random()
+    for status, weight in STATUS_WEIGHTS:
+        if roll < weight:
+            return status
+        roll -= weight
+    return STATUS_WEIGHTS[0][0]
+
+
+def _description(rng: random.Random) -> str:
+    if rng.random() < NULL_DESCRIPTION_RATE:
+        return "\\N"
+    words = min(DESCRIPTION_WORDS_MAX, 5 + int(rng.expovariate(1 / DESCRIPTION_WORDS_MEAN)))
+    return " ".join(rng.choices(WORDS, k=words)).capitalize() + "."
+
+
+def generate_projects(chunk: int, first: int, count: int, seed: int, base_id: int, user_base_id: int,
+                      users: int, start: datetime, end: datetime) -> bytes:
+    """COPY text rows for projects first..first+count of the generated set"""
+    rng = random.Random(f"{seed}:projects:{chunk}")
+    span = end - start
+    lines = []
+    for index in range(first, first + count):
+        project_id = base_id + 1 + index
+        owner_index = min(users - 1, int(users * rng.random() ** OWNER_SKEW))
+        signup = user_signup(start, span, users, owner_index)
+        created_at = signup + (end - signup) * rng.random()
+        updated_at = created_at + (end - created_at) * rng.random() ** 2
+        lines.append("\t".join((
+            str(project_id),
+            f"{rng.choice(PROJECT_ADJECTIVES).title()} {rng.choice(PROJECT_NOUNS)} {project_id}",
+            _description(rng),
+            str(user_base_id + 1 + owner_index),
+            _pick_status(rng),
+            _timestamp(created_at),
+            _timestamp(updated_at),
+        )))
+    return ("\n".join(lines) + "\n").encode()
+
+
+async def _stream(data: bytes):
+    """Feed COPY in slices instead of one giant buffer"""
+    view = memoryview(data)
+    for offset in range(0, len(view), STREAM_BYTES):
+        yield view[offset:offset + STREAM_BYTES]
+
+
+async def load(db, executor: ProcessPoolExecutor, workers: int, table: str, columns: tuple,
+               total: int, generate, *args):
+    """Generate `total` rows in chunks across processes and COPY them in over `workers` connections"""
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(workers)
+    loaded = 0
+    started = time.monotonic()
+
+    async def load_chunk(chunk: int, first: int, count: int):
+        nonlocal loaded
+        async with slots:
+            data = await loop.run_in_executor(executor, generate, chunk, first, count, *args)
+            async with db.get_connection() as conn:
+                async with conn.transaction():
+                    # Chunks are re-runnable by starting over, so don't wait for each commit's WAL flush
+                    await conn.execute("SET LOCAL synchronous_commit = off")
+                    await conn.copy_to_table(table, source=_stream(data), columns=columns, format="text")
+            loaded += count
+            rate = loaded / max(time.monotonic() - started, 1e-9)
+            print(f"   {table}: {loaded:,}/{total:,} rows ({rate:,.0f} rows/s)", end="\r", flush=True)
+
+    await asyncio.gather(*(
+        load_chunk(chunk, first, min(CHUNK_SIZE, total - first))
+        for chunk, first in enumerate(range(0, total, CHUNK_SIZE))
+    ))
+    if total:
+        print(f"✓ Loaded {total:,} {table} in {time.monotonic() - started:.1f}s" + " " * 20)
+
+
+async def create_archive_partitions(db, first_year: int, last_year: int):
+    """
+    Create the archive partitions for the years the data spans.
+    Postgres refuses to create a partition while the default partition holds rows in its
+    range, so years already in projects_archived_default keep being stored there.
+    """
+    rows = await db.fetch_all(
+        "SELECT DISTINCT EXTRACT(YEAR FROM created_at)::int AS year FROM projects_archived_default"
+    )
+    in_default = {row['year'] for row in rows}
+    for year in range(first_year, last_year + 1):
+        if year in in_default:
+            print(f"  Archived {year} projects stay in projects_archived_default (it already holds some)")
+            continue
+        await create_archive_partition(db, year)
+
+
+async def seed(users: int, projects: int, seed_value: int, workers: int, years: int, end: date,
+               reset: bool = False):
+    """Append `users` users and `projects` projects owned by them"""
+    if projects and not users:
+        raise ValueError("Projects need owners: pass --users as well")
+
+    await init_database()
+    db = get_databridge()
+    end_at = datetime.combine(end, datetime.min.time())
+    start_at = end_at - timedelta(days=365 * years)
+
+    try:
+        if reset:
+            await db.execute("TRUNCATE users, projects, project_events, user_deletions RESTART IDENTITY CASCADE")
+            print("✓ Emptied users, projects and activity")
+
+        if await is_partitioned(db):
+            await create_archive_partitions(db, start_at.year, end_at.year)
+
+        user_base_id = await db.fetch_val("SELECT COALESCE(MAX(id), 0) FROM users")
+        project_base_id = await db.fetch_val("SELECT COALESCE(MAX(id), 0) FROM projects")
+        if projects:
+            # Reserve the generated IDs so creates during the load draw IDs after them
+            await db.execute(
+                "SELECT setval(pg_get_serial_sequence('projects', 'id'), $1)", project_base_id + projects
+            )
+        print(f"🌱 Seeding {users:,} users and {projects:,} projects (seed {seed_value}, {workers} workers)")
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            await load(
+                db, executor, workers, "users", USER_COLUMNS, users,
+                generate_users, seed_value, user_base_id, users, start_at, end_at
+            )
+            await load(
+                db, executor, workers, "projects", PROJECT_COLUMNS, projects,
+                generate_projects, seed_value, project_base_id, user_base_id, users, start_at, end_at
+            )
+
+        # IDs were set explicitly, so move the sequences past them
+        await db.execute("SELECT setval(pg_get_serial_sequence('users', 'id'), (SELECT MAX(id) FROM users))")
+        await db.execute("SELECT setval(pg_get_serial_sequence('projects', 'id'), (SELECT MAX(id) FROM projects))")
+        if await is_partitioned(db):
+            # Nothing in the partitioned table itself rejects a duplicate id
+            await check_unique_ids(db)
+        await db.execute("ANALYZE users")
+        await db.execute("ANALYZE projects")
+        print("🎉 Seeding complete")
+    finally:
+        await db.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load a large synthetic dataset for benchmarks")
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--projects", type=int, default=1000000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=min(8, os.cpu_count() or 1),
+                        help="generator processes and concurrent COPY connections (the pool allows 10)")
+    parser.add_argument("--years", type=int, default=5, help="how far back signups and projects go")
+    parser.add_argument("--end", type=date.fromisoformat, default=date.today(),
+                        help="latest timestamp (YYYY-MM-DD); pin it to reproduce a dataset on another day")
+    parser.add_argument("--reset", action="store_true", help="empty users, projects and activity first")
+    args = parser.parse_args()
+    asyncio.run(seed(args.users, args.projects, args.seed, args.workers, args.years, args.end, args.reset))
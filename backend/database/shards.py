@@ -0,0 +1,160 @@
+"""
+Owner-based sharding of projects across multiple PostgreSQL databases.
+Owners map to shards through a consistent hash ring, with per-owner overrides
+(written by the rebalance tool) kept in the main database's owner_shards table.
+"""
+import asyncio
+import bisect
+import contextvars
+import hashlib
+import time
+from typing import Optional
+from database.databridge import DataBridge
+from settings import AppConfig, get_settings
+
+
+# Project IDs are interleaved across shards: shard k hands out k+1, k+1+STRIDE, ...
+# so IDs stay unique everywhere and the shard that created a project is (id - 1) % STRIDE.
+SHARD_ID_STRIDE = 64
+
+# Points per shard on the hash ring; more points give a more even spread
+VIRTUAL_NODES = 128
+
+
+def parse_shards(spec: str) -> dict[int, str]:
+    """Parse "0=postgresql://...,1=postgresql://..." into {shard_id: url}"""
+    shards = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        shard_id, _, url = entry.partition("=")
+        shard_id = int(shard_id)
+        if not 0 <= shard_id < SHARD_ID_STRIDE:
+            raise ValueError(f"Shard id must be between 0 and {SHARD_ID_STRIDE - 1}, got {shard_id}")
+        shards[shard_id] = url
+    return shards
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class ShardRouter:
+    """
+    Routes project queries to shards.
+    Single-owner operations go to exactly one shard; everything else scatters to all of them.
+    """
+
+    def __init__(self, directory: DataBridge, settings: Optional[AppConfig] = None):
+        settings = settings or get_settings()
+        self.directory = directory  # Main database: users and owner_shards
+        self.shards: dict[int, DataBridge] = {
+            shard_id: DataBridge(settings.model_copy(update={"database_url": url}))
+            for shard_id, url in parse_shards(settings.db_shards).items()
+        }
+        if not self.shards:
+            raise ValueError("DB_SHARDS is empty")
+
+        ring = sorted(
+            (_hash(f"shard-{shard_id}#{i}"), shard_id)
+            for shard_id in self.shards
+            for i in range(VIRTUAL_NODES)
+        )
+        self._ring_points = [point for point, _ in ring]
+        self._ring_shards = [shard_id for _, shard_id in ring]
+
+        self._override_ttl = settings.db_shard_override_ttl_seconds
+        self._overrides: dict[int, int] = {}
+        self._overrides_loaded_at = float("-inf")
+        self._overrides_load: Optional[asyncio.Task] = None
+
+    async def connect(self):
+        await asyncio.gather(*(shard.connect() for shard in self.shards.values()))
+
+    async def disconnect(self):
+        await asyncio.gather(*(shard.disconnect() for shard in self.shards.values()))
+
+    def ring_shard_for_owner(self, owner_id: int) -> int:
+        """Shard an owner hashes to, ignoring overrides"""
+        index = bisect.bisect(self._ring_points, _hash(f"owner-{owner_id}")) % len(self._ring_points)
+        return self._ring_shards[index]
+
+    async def shard_id_for_owner(self, owner_id: int) -> int:
+        """Shard that currently holds an owner's projects"""
+        await self._refresh_overrides()
+        return self._overrides.get(owner_id, self.ring_shard_for_owner(owner_id))
+
+    async def for_owner(self, owner_id: int) -> DataBridge:
+        return self.shards[await self.shard_id_for_owner(owner_id)]
+
+    def for_project(self, project_id: int) -> list[DataBridge]:
+        """
+        Shards to look for a project in, most likely first.
+        The creating shard is tried first; the rest only matter if the owner was rebalanced.
+        """
+        home = (project_id - 1) % SHARD_ID_STRIDE
+        ordered = sorted(self.shards, key=lambda shard_id: shard_id != home)
+        return [self.shards[shard_id] for shard_id in ordered]
+
+    async def scatter(self, method: str, query: str, *args) -> list:
+        """Run the same query on every shard concurrently, returning one result per shard"""
+        return await asyncio.gather(
+            *(getattr(shard, method)(query, *args) for shard in self.shards.values())
+        )
+
+    async def _refresh_overrides(self):
+        """
+        Reload owner overrides from the directory once they are older than the TTL.
+        Concurrent callers share one load; a failed load keeps the current map and is retried on the next call.
+        """
+        if time.monotonic() - self._overrides_loaded_at < self._override_ttl:
+            return
+        if self._overrides_load is None or self._overrides_load.done():
+            self._overrides_load = asyncio.create_task(self._load_overrides(), context=contextvars.Context())
+        await asyncio.shield(self._overrides_load)
+
+    async def _load_overrides(self):
+        rows = await self.directory.fetch_all("SELECT owner_id, shard_id FROM owner_shards")
+        self._overrides = {row['owner_id']: row['shard_id'] for row in rows}
+        self._overrides_loaded_at = time.monotonic()
+
+async def init_shards(directory: DataBridge, router: ShardRouter):
+    """Create the owner directory in the main database and the projects table on every shard"""
+    await directory.execute("""
+        CREATE TABLE IF NOT EXISTS owner_shards (
+            owner_id INTEGER PRIMARY KEY,
+            shard_id INTEGER NOT NULL,
+            moved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+    print("✓ Owner shard directory created/verified")
+
+    for shard_id, shard in router.shards.items():
+        # No FK to users: they live in the main database
+        await shard.execute("""
+            CREATE TABLE IF NOT EXISTS projects (
+                id SERIAL PRIMARY KEY,
+                name VARCHAR(100) NOT NULL,
+                description TEXT,
+                owner_id INTEGER NOT NULL,
+                status VARCHAR(20) DEFAULT 'active',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+        """)
+        await shard.execute("""
+            CREATE INDEX IF NOT EXISTS idx_projects_owner ON projects(owner_id);
+        """)
+        await shard.execute("""
+            CREATE INDEX IF NOT EXISTS idx_projects_created_at ON projects(created_at);
+        """)
+
+        # Interleave the ID sequence so IDs are unique across shards
+        increment = await shard.fetch_val(
+            "SELECT increment_by FROM pg_sequences WHERE sequencename = 'projects_id_seq'"
+        )
+        if increment != SHARD_ID_STRIDE:
+            max_id = await shard.fetch_val("SELECT COALESCE(MAX(id), 0) FROM projects")
+            next_id = max_id + 1 + (shard_id - max_id) % SHARD_ID_STRIDE
+            await shard.execute(
+                f"ALTER SEQUENCE projects_id_seq INCREMENT BY {SHARD_ID_STRIDE} RESTART WITH {next_id}"
+            )
+        print(f"✓ Shard {shard_id} projects table created/verified")
@@ -1,21 +1,24 @@
+from typing import Optional
+from fastapi import Header, HTTPException, status
 from services.project_service import ProjectService
+from services.sharded_project_service import ShardedProjectService
 from services.user_service import UserService
-from database.databridge import DataBridge
+from services.dashboard_service import DashboardService
+from services.activity_service import ActivityService
+from database.databridge import DataBridge, set_request_deadline
+from database.shards import ShardRouter
+from middleware.profiling import is_admin_token
 import asyncpg
 from settings import config
 from sqlalchemy.ext.asyncio import create_async_engine
 
 
 async def create_database_connection() -> asyncpg.Connection:
-    """Create and return a new database connection using settings from config"""
-    database_config = config.database
-    return await asyncpg.connect(
-        database_config.url,
-        min_size=2,
-        max_size=10,
-        ssl='require',  # Required for Neon
-        timeout=3
-    )
+    """
+    Create and return a new database connection using settings from config.
+    Uses DataBridge's SSL/timeout options and retries while a suspended compute wakes up.
+    """
+    return await get_databridge().open_connection()
 
 
 postgres_engine = create_async_engine(
@@ -24,8 +27,11 @@ postgres_engine = create_async_engine(
 )
 
 _databridge = None
+_shard_router = None
 _user_service = None
 _project_service = None
+_dashboard_service = None
+_activity_service = None
 
 
 def get_databridge() -> DataBridge:
@@ -34,14 +40,48 @@ def get_databridge() -> DataBridge:
         _databridge = DataBridge()
     return _databridge
 
+def get_shard_router() -> Optional[ShardRouter]:
+    """Shard router when DB_SHARDS is configured, otherwise None"""
+    global _shard_router
+    if _shard_router is None and config.db_shards:
+        _shard_router = ShardRouter(get_databridge())
+    return _shard_router
+
 def get_user_service() -> UserService:
     global _user_service
     if _user_service is None:
-        _user_service = UserService(get_databridge())
+        _user_service = UserService(get_databridge(), get_shard_router())
     return _user_service
 
+def get_activity_service() -> ActivityService:
+    global _activity_service
+    if _activity_service is None:
+        _activity_service = ActivityService(get_databridge())
+    return _activity_service
+
 def get_project_service() -> ProjectService:
     global _project_service
     if _project_service is None:
-        _project_service = ProjectService(get_databridge())
+        shards = get_shard_router()
+        if shards:
+            _project_service = ShardedProjectService(get_databridge(), shards, get_activity_service())
+        else:
+            _project_service = ProjectService(get_databridge(), activity=get_activity_service())
     return _project_service
+
+def get_dashboard_service() -> DashboardService:
+    global _dashboard_service
+    if _dashboard_service is None:
+        _dashboard_service = DashboardService(get_databridge(), get_project_service())
+    return _dashboard_service
+
+def with_deadline(seconds: float):
+    """Route dependency that tightens the request's DB deadline to `seconds`"""
+    async def _apply_deadline():
+        set_request_deadline(seconds)
+    return _apply_deadline
+
+async def require_admin(x_admin_token: str = Header(None)):
+    """Route dependency for admin-only endpoints; 404 unless DEBUG_ADMIN_TOKEN matches"""
+    if not is_admin_token(x_admin_token, config.debug_admin_token):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
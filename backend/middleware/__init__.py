@@ -0,0 +1,20 @@
+"""
+Middleware package for request-level concerns.
+"""
+from middleware.admission import AdmissionControlMiddleware, AdmissionController, Priority
+from middleware.deadline import RequestDeadlineMiddleware
+from middleware.profiling import RequestProfilingMiddleware, SamplingProfiler
+from middleware.response_cache import ResponseCache, ResponseCacheMiddleware
+from middleware.wake import PrewakeMiddleware
+
+__all__ = [
+    "AdmissionControlMiddleware",
+    "AdmissionController",
+    "PrewakeMiddleware",
+    "Priority",
+    "RequestDeadlineMiddleware",
+    "RequestProfilingMiddleware",
+    "ResponseCache",
+    "ResponseCacheMiddleware",
+    "SamplingProfiler",
+]
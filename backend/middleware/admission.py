@@ -0,0 +1,104 @@
+"""
+Admission control middleware.
+Fast-fails requests with 503 once the database pool is saturated,
+instead of letting them queue on pool.acquire() until clients time out.
+"""
+from enum import IntEnum
+from typing import Callable, Optional
+from fastapi.responses import JSONResponse
+from database.databridge import DataBridge
+
+
+class Priority(IntEnum):
+    """Request priority; higher values are shed later"""
+    READ = 1
+    WRITE = 2
+    CRITICAL = 4
+    EXEMPT = 0  # Never shed (endpoints that don't touch the database)
+
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+DEFAULT_ROUTE_PRIORITIES = {
+    "/": Priority.EXEMPT,
+    "/health": Priority.EXEMPT,
+    "/ready": Priority.CRITICAL,
+}
+
+
+class AdmissionController:
+    """
+    Decides whether a request may proceed based on pool saturation.
+    Limits scale with priority, so reads are shed first, then writes, then /ready.
+    """
+
+    def __init__(
+        self,
+        db: DataBridge,
+        max_queue_depth: int,
+        max_wait_ms: float,
+        route_priorities: Optional[dict[str, Priority]] = None,
+    ):
+        self.db = db
+        self.max_queue_depth = max_queue_depth
+        self.max_wait_ms = max_wait_ms
+        self.route_priorities = {**DEFAULT_ROUTE_PRIORITIES, **(route_priorities or {})}
+        self.shed_counts: dict[str, int] = {p.name.lower(): 0 for p in Priority}
+
+    def priority_for(self, method: str, path: str) -> Priority:
+        """Resolve the priority of a request from its route, falling back to its method"""
+        priority = self.route_priorities.get(path.rstrip("/") or "/")
+        if priority is not None:
+            return priority
+        return Priority.WRITE if method in WRITE_METHODS else Priority.READ
+
+    def should_shed(self, priority: Priority) -> bool:
+        """Check pool wait-queue depth and acquire wait time against this priority's limits"""
+        if priority == Priority.EXEMPT:
+            return False
+        overloaded = (
+            self.db.acquire_queue_depth >= self.max_queue_depth * priority
+            or self.db.acquire_wait_ms >= self.max_wait_ms * priority
+        )
+        if overloaded:
+            self.shed_counts[priority.name.lower()] += 1
+        return overloaded
+
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware that rejects requests with 503 and Retry-After while the pool is saturated.
+    Register it before CORSMiddleware so rejections still carry CORS headers.
+    """
+
+    def __init__(
+        self,
+        app,
+        databridge_getter: Callable[[], DataBridge],
+        max_queue_depth: int = 20,
+        max_wait_ms: float = 250,
+        retry_after: int = 1,
+        route_priorities: Optional[dict[str, Priority]] = None,
+    ):
+        self.app = app
+        self.retry_after = retry_after
+        self.controller = AdmissionController(
+            databridge_getter(), max_queue_depth, max_wait_ms, route_priorities
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        priority = self.controller.priority_for(scope["method"], scope["path"])
+        if self.controller.should_shed(priority):
+            response = JSONResponse(
+                {"detail": "Server is overloaded, please retry shortly"},
+                status_code=503,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
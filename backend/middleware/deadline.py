@@ -0,0 +1,66 @@
+"""
+Request deadline middleware.
+Gives every request a database deadline and cancels its in-flight work
+as soon as the client disconnects, freeing the pooled connection.
+"""
+import asyncio
+import time
+from database.databridge import request_deadline
+
+
+class RequestDeadlineMiddleware:
+    """
+    ASGI middleware that sets a default request deadline and watches for client disconnects.
+    The app runs in its own task; on http.disconnect that task is cancelled, which makes
+    asyncpg cancel any running query server-side. Work that runs after the response is
+    complete (background tasks, dependency teardown) is left alone: servers report a
+    disconnect as soon as the last body chunk is sent.
+    """
+
+    def __init__(self, app, default_seconds: float = 10):
+        self.app = app
+        self.default_seconds = default_seconds
+        self.cancelled_requests = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # The watcher is the only reader of `receive`; the app reads from this queue
+        messages: asyncio.Queue = asyncio.Queue()
+        client_gone = False
+        response_complete = False
+
+        async def send_tracking(message):
+            nonlocal response_complete
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                response_complete = True
+
+        token = request_deadline.set(time.monotonic() + self.default_seconds)
+        try:
+            app_task = asyncio.create_task(self.app(scope, messages.get, send_tracking))
+        finally:
+            request_deadline.reset(token)
+
+        async def watch_disconnect():
+            nonlocal client_gone
+            while True:
+                message = await receive()
+                messages.put_nowait(message)
+                if message["type"] == "http.disconnect":
+                    if not app_task.done() and not response_complete:
+                        client_gone = True
+                        app_task.cancel()
+                    return
+
+        watcher = asyncio.create_task(watch_disconnect())
+        try:
+            await app_task
+        except asyncio.CancelledError:
+            if not client_gone:
+                raise
+            self.cancelled_requests += 1
+        finally:
+            watcher.cancel()
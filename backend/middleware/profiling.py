@@ -0,0 +1,163 @@
+"""
+In-process sampling profiler for live workers.
+A background thread samples every thread's stack with sys._current_frames() and
+aggregates them into collapsed stacks (flamegraph.pl / speedscope compatible).
+Nothing runs unless a profile has been requested.
+"""
+import asyncio
+import hmac
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Optional
+
+
+# Per-request profiles kept for retrieval through /debug/profile/{profile_id}
+MAX_STORED_PROFILES = 20
+stored_profiles: OrderedDict[str, "Profile"] = OrderedDict()
+_profile_ids = itertools.count(1)
+
+
+class Profile:
+    """Collapsed stack counts from one profiling session"""
+
+    def __init__(self, stacks: Counter, interval: float, duration: float):
+        self.stacks = stacks
+        self.interval = interval
+        self.duration = duration
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed format: 'frame;frame;frame count' per line"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    def speedscope(self, name: str = "profile") -> dict:
+        """Speedscope 'sampled' profile, one weighted sample per distinct stack"""
+        frame_index: dict[str, int] = {}
+        samples, weights = [], []
+        for stack, count in self.stacks.items():
+            samples.append([frame_index.setdefault(frame, len(frame_index)) for frame in stack.split(";")])
+            weights.append(count * self.interval)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": [{"name": frame} for frame in frame_index]},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": self.duration,
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Samples thread stacks from a background thread until stopped.
+    With `task` set, only samples the loop thread while that asyncio task is running,
+    which attributes time to a single request.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        task: Optional[asyncio.Task] = None,
+    ):
+        self.interval = interval
+        self.loop = loop
+        self.task = task
+        self.loop_thread_id = threading.get_ident() if task else None
+        self._stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._started = 0.0
+
+    def start(self):
+        self._started = time.monotonic()
+        self._thread.start()
+
+    def stop(self) -> Profile:
+        self._stop.set()
+        self._thread.join()
+        return Profile(self._stacks, self.interval, time.monotonic() - self._started)
+
+    def _run(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            if self.task is not None:
+                if asyncio.current_task(self.loop) is not self.task:
+                    continue
+                frames = {self.loop_thread_id: sys._current_frames().get(self.loop_thread_id)}
+            else:
+                frames = sys._current_frames()
+
+            for thread_id, frame in frames.items():
+                if thread_id == own_id or frame is None:
+                    continue
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self._stacks[";".join(reversed(stack))] += 1
+
+
+def is_admin_token(token: Optional[str], expected: str) -> bool:
+    """Constant-time admin token check; always False when no token is configured"""
+    return bool(expected) and token is not None and hmac.compare_digest(token, expected)
+
+
+class RequestProfilingMiddleware:
+    """
+    Profiles a single request when it carries `X-Profile: 1` and a valid `X-Admin-Token`.
+    The response gets an `X-Profile-Id` header; fetch the result from /debug/profile/{id}.
+    Only registered when DEBUG_ADMIN_TOKEN is set.
+    """
+
+    def __init__(self, app, admin_token: str, interval: float):
+        self.app = app
+        self.admin_token = admin_token
+        self.interval = interval
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        if headers.get(b"x-profile") != b"1" or not is_admin_token(
+            headers.get(b"x-admin-token", b"").decode(), self.admin_token
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = str(next(_profile_ids))
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        profiler = SamplingProfiler(
+            self.interval, asyncio.get_running_loop(), asyncio.current_task()
+        )
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            stored_profiles[profile_id] = profiler.stop()
+            while len(stored_profiles) > MAX_STORED_PROFILES:
+                stored_profiles.popitem(last=False)
@@ -0,0 +1,165 @@
+"""
+Response cache middleware.
+Stores the final encoded body of cacheable GET responses, keyed by route, query
+parameters and the data versions the route reads. A hit is replayed straight from
+memory, without routing, database access or response-model serialization.
+"""
+import gzip
+import re
+import time
+from collections import OrderedDict
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode
+from services.cache import DataVersions
+
+
+# Cacheable routes and the resources their responses are built from.
+# Project responses carry owner names and hide tombstoned owners, so they depend on users too.
+DEFAULT_CACHED_ROUTES = [
+    (re.compile(r"^/api/v1/projects(/count|/\d+)?$"), ("projects", "users")),
+    (re.compile(r"^/api/v1/users(/count|/search|/\d+)?$"), ("users",)),
+]
+
+# Headers recomputed for every replay, or that only describe the request that produced the body
+_DROPPED_HEADERS = {b"content-length", b"content-encoding", b"x-profile-id"}
+
+
+class ResponseCache:
+    """LRU cache of encoded response bodies, bounded by total body size"""
+
+    def __init__(self, max_bytes: int, ttl_seconds: float):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.size = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        # key -> (expires_at, headers, body, compressed)
+        self._entries: OrderedDict[tuple, tuple[float, list, bytes, bool]] = OrderedDict()
+
+    def get(self, key: tuple) -> Optional[tuple[list, bytes, bool]]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry[1:]
+
+    def set(self, key: tuple, headers: list, body: bytes, compressed: bool):
+        if len(body) > self.max_bytes:
+            return
+        self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, headers, body, compressed)
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.stats["evictions"] += 1
+
+    def _remove(self, key: tuple):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[2])
+
+
+class ResponseCacheMiddleware:
+    """
+    Serves repeated GETs on list and detail routes from a ResponseCache.
+    Only complete 200 responses are stored. Bodies of at least `compress_min_bytes`
+    are stored gzipped and sent as-is to clients that accept gzip.
+    Profiled requests (`X-Profile: 1`) bypass the cache so the handler actually runs.
+    """
+
+    def __init__(
+        self,
+        app,
+        versions: DataVersions,
+        max_bytes: int,
+        ttl_seconds: float,
+        compress_min_bytes: Optional[int] = None,
+        routes: Optional[list[tuple[re.Pattern, tuple[str, ...]]]] = None,
+    ):
+        self.app = app
+        self.versions = versions
+        self.cache = ResponseCache(max_bytes, ttl_seconds)
+        self.compress_min_bytes = compress_min_bytes
+        self.routes = routes or DEFAULT_CACHED_ROUTES
+
+    def _resources_for(self, path: str) -> Optional[tuple[str, ...]]:
+        for pattern, resources in self.routes:
+            if pattern.match(path):
+                return resources
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        resources = self._resources_for(scope["path"].rstrip("/"))
+        request_headers = dict(scope["headers"])
+        if resources is None or request_headers.get(b"x-profile") == b"1":
+            await self.app(scope, receive, send)
+            return
+
+        # Versions are read before the handler runs: a write landing mid-request
+        # stores this response under a version no later request will ask for
+        query = urlencode(sorted(parse_qsl(scope["query_string"].decode(), keep_blank_values=True)))
+        key = (scope["path"], query, tuple(self.versions.get(resource) for resource in resources))
+        accepts_gzip = b"gzip" in request_headers.get(b"accept-encoding", b"")
+
+        entry = self.cache.get(key)
+        if entry is not None:
+            headers, body, compressed = entry
+            if compressed and accepts_gzip:
+                headers = [*headers, (b"content-encoding", b"gzip")]
+            elif compressed:
+                body = gzip.decompress(body)
+            await self._send_hit(send, headers, body)
+            return
+
+        start = None
+        chunks = []
+
+        async def capture(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            headers = start.get("headers", [])
+            if start["status"] == 200 and not any(name.lower() == b"content-encoding" for name, _ in headers):
+                self._store(key, headers, body)
+            await send({**start, "headers": [*headers, (b"x-cache", b"miss")]})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, capture)
+
+    def _store(self, key: tuple, headers: list, body: bytes):
+        headers = [(name, value) for name, value in headers if name.lower() not in _DROPPED_HEADERS]
+        headers.append((b"vary", b"Accept-Encoding"))
+        if self.compress_min_bytes is not None and len(body) >= self.compress_min_bytes:
+            self.cache.set(key, headers, gzip.compress(body, compresslevel=5), True)
+        else:
+            self.cache.set(key, headers, body, False)
+
+    @staticmethod
+    async def _send_hit(send, headers: list, body: bytes):
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                *headers,
+                (b"content-length", str(len(body)).encode()),
+                (b"x-cache", b"hit"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,41 @@
+"""
+Pre-wake middleware for serverless Postgres.
+When a request arrives after the database has been idle long enough for the
+compute to suspend, the wake-up starts immediately in the background, so it
+overlaps with body parsing and validation instead of following them.
+"""
+import asyncio
+import time
+from typing import Callable
+from database.databridge import DataBridge
+
+
+class PrewakeMiddleware:
+    """Starts DataBridge.wake() for the first request after `idle_seconds` without queries"""
+
+    def __init__(self, app, databridge_getter: Callable[[], DataBridge], idle_seconds: float):
+        self.app = app
+        self.databridge_getter = databridge_getter
+        self.idle_seconds = idle_seconds
+        self.prewakes = 0
+        self._wakes: set[asyncio.Task] = set()  # Strong references until each wake-up finishes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            db = self.databridge_getter()
+            last_query_at = db.last_query_at
+            if last_query_at is None or time.monotonic() - last_query_at > self.idle_seconds:
+                self.prewakes += 1
+                # Mark activity now so the requests right behind this one don't also fire
+                db.last_query_at = time.monotonic()
+                task = asyncio.create_task(self._wake(db))
+                self._wakes.add(task)
+                task.add_done_callback(self._wakes.discard)
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _wake(db: DataBridge):
+        try:
+            await db.wake()
+        except Exception as e:
+            print(f"❌ Database pre-wake failed: {e}")
@@ -2,7 +2,12 @@
 Models package for domain models and request/response schemas.
 """
 from models.user import User, UserCreate, UserResponse
-from models.project import Project, ProjectCreate, ProjectResponse
+from models.project import (
+    Project, ProjectCreate, ProjectResponse, ProjectBulkUpdate, ProjectBulkUpdateResponse
+)
+from models.count import CountResponse
+from models.dashboard import DashboardResponse
+from models.activity import ProjectEvent
 
 __all__ = [
     "User",
@@ -11,5 +16,10 @@ __all__ = [
     "Project",
     "ProjectCreate",
     "ProjectResponse",
+    "ProjectBulkUpdate",
+    "ProjectBulkUpdateResponse",
+    "CountResponse",
+    "DashboardResponse",
+    "ProjectEvent",
 ]
 
@@ -0,0 +1,14 @@
+"""
+Project activity log schemas.
+"""
+from typing import Any, Optional
+from pydantic import BaseModel
+
+
+class ProjectEvent(BaseModel):
+    """One entry in the project activity log"""
+    project_id: int
+    event_type: str  # created, updated or deleted
+    owner_id: Optional[int] = None
+    changes: Optional[dict[str, Any]] = None  # Fields set by a create or update
+    occurred_at: str  # ISO format string
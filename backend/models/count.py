@@ -0,0 +1,10 @@
+"""
+Count response schema shared by list endpoints.
+"""
+from pydantic import BaseModel
+
+
+class CountResponse(BaseModel):
+    """Total row count for a list endpoint"""
+    count: int
+    exact: bool  # False when the count is a planner estimate or served from cache
@@ -0,0 +1,13 @@
+"""
+Dashboard response schema.
+"""
+from pydantic import BaseModel
+from models.project import ProjectResponse
+from models.user import UserResponse
+
+
+class DashboardResponse(BaseModel):
+    """Everything the frontend pages need, in one response"""
+    users: list[UserResponse]
+    recent_projects: list[ProjectResponse]
+    project_counts: dict[str, int]  # Number of projects per status
@@ -2,8 +2,9 @@
 Project domain models and schemas.
 """
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel, Field
+from typing import List, Optional
+from pydantic import BaseModel, Field, field_validator, model_validator
+from models.timestamps import to_local_naive
 
 
 class ProjectBase(BaseModel):
@@ -25,6 +26,34 @@ class ProjectUpdate(BaseModel):
     status: Optional[str] = Field(None, pattern="^(active|completed|archived)$")
 
 
+class ProjectBulkUpdate(BaseModel):
+    """Schema for updating a set of projects, selected by ID and/or filters"""
+    ids: Optional[List[int]] = Field(None, min_length=1)
+    owner_id: Optional[int] = None
+    status: Optional[str] = Field(None, pattern="^(active|completed|archived)$")
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    update: ProjectUpdate
+
+    @field_validator("created_after", "created_before")
+    @classmethod
+    def to_stored_time(cls, value: Optional[datetime]) -> Optional[datetime]:
+        return to_local_naive(value)
+
+    @model_validator(mode="after")
+    def check_selection(self):
+        if not self.selection():
+            raise ValueError("Select projects by ids or at least one filter")
+        if not self.update.model_dump(exclude_none=True):
+            raise ValueError("update must set at least one field")
+        return self
+
+    def selection(self) -> dict:
+        """Selectors that were provided, as {name: value}"""
+        selectors = ("ids", "owner_id", "status", "created_after", "created_before")
+        return {name: getattr(self, name) for name in selectors if getattr(self, name) is not None}
+
+
 class Project(ProjectBase):
     """Full project domain model"""
     id: int
@@ -50,3 +79,8 @@ class ProjectResponse(BaseModel):
     class Config:
         from_attributes = True
 
+
+class ProjectBulkUpdateResponse(BaseModel):
+    """Result of a bulk project update"""
+    count: int
+    projects: Optional[List[ProjectResponse]] = None  # Only when returning=true
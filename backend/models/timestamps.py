@@ -0,0 +1,15 @@
+"""
+Time-zone handling for timestamps supplied by clients.
+"""
+from datetime import datetime
+from typing import Optional
+
+
+def to_local_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Convert an aware datetime to naive server-local time, the way timestamps are stored.
+    Comparing an aware value with the naive TIMESTAMP columns (or datetime.now()) raises TypeError.
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone().replace(tzinfo=None)
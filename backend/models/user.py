@@ -47,3 +47,13 @@ class UserResponse(BaseModel):
     class Config:
         from_attributes = True
 
+
+
+class UserDeletionStatus(BaseModel):
+    """Progress of a background user deletion"""
+    user_id: int
+    status: str  # pending, running, completed or failed
+    projects_total: int
+    projects_deleted: int
+    requested_at: str  # ISO format string
+    completed_at: Optional[str] = None  # ISO format string
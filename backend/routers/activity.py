@@ -0,0 +1,27 @@
+"""
+Activity log API routes.
+"""
+from datetime import datetime
+from typing import List
+from fastapi import APIRouter, Query, Depends
+from dependencies import get_activity_service
+from models.activity import ProjectEvent
+from models.timestamps import to_local_naive
+from services.activity_service import ActivityService
+
+
+router = APIRouter(
+    prefix="/activity",
+    tags=["activity"]
+)
+
+
+@router.get("", response_model=List[ProjectEvent])
+async def get_activity(
+    since: datetime = Query(..., description="Start of the time range (inclusive)"),
+    until: datetime = Query(None, description="End of the time range (exclusive), defaults to now"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of events"),
+    service: ActivityService = Depends(get_activity_service)
+):
+    """Get activity across all projects within a time range, newest first"""
+    return await service.get_activity(to_local_naive(since), to_local_naive(until), limit)
@@ -0,0 +1,22 @@
+"""
+Dashboard API routes.
+"""
+from fastapi import APIRouter, Query, Depends
+from dependencies import get_dashboard_service
+from models.dashboard import DashboardResponse
+from services.dashboard_service import DashboardService
+
+
+router = APIRouter(
+    prefix="/dashboard",
+    tags=["dashboard"]
+)
+
+
+@router.get("", response_model=DashboardResponse)
+async def get_dashboard(
+    recent_limit: int = Query(10, ge=1, le=100, description="Number of recent projects"),
+    service: DashboardService = Depends(get_dashboard_service)
+):
+    """Get users, recent projects and per-status project counts in one response"""
+    return await service.get_dashboard(recent_limit)
@@ -0,0 +1,67 @@
+"""
+Debug API routes (admin only).
+"""
+import asyncio
+from fastapi import APIRouter, HTTPException, status, Query, Depends
+from fastapi.responses import PlainTextResponse, JSONResponse
+from dependencies import require_admin
+from middleware.profiling import SamplingProfiler, stored_profiles
+from settings import get_settings
+
+
+router = APIRouter(
+    prefix="/debug",
+    tags=["debug"],
+    dependencies=[Depends(require_admin)]
+)
+
+# Only one worker-wide profile at a time
+_profile_lock = asyncio.Lock()
+
+
+def _render(profile, output_format: str, name: str):
+    if output_format == "speedscope":
+        return JSONResponse(
+            content=profile.speedscope(name),
+            headers={"Content-Disposition": f'attachment; filename="{name}.speedscope.json"'}
+        )
+    return PlainTextResponse(profile.collapsed())
+
+
+@router.get("/profile")
+async def profile_worker(
+    seconds: float = Query(5, gt=0, le=60, description="How long to sample for"),
+    output_format: str = Query(
+        "collapsed", alias="format", pattern="^(collapsed|speedscope)$",
+        description="collapsed stacks (flamegraph.pl) or a speedscope file"
+    )
+):
+    """Sample every thread of this worker, including the event loop, for N seconds"""
+    if _profile_lock.locked():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A profile is already running on this worker"
+        )
+    async with _profile_lock:
+        profiler = SamplingProfiler(get_settings().profile_sample_interval_ms / 1000)
+        profiler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profile = profiler.stop()
+    return _render(profile, output_format, "worker")
+
+
+@router.get("/profile/{profile_id}")
+async def get_request_profile(
+    profile_id: str,
+    output_format: str = Query("collapsed", alias="format", pattern="^(collapsed|speedscope)$")
+):
+    """Get a per-request profile recorded with the X-Profile header"""
+    profile = stored_profiles.get(profile_id)
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Profile with id {profile_id} not found"
+        )
+    return _render(profile, output_format, f"request-{profile_id}")
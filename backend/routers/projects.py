@@ -1,11 +1,19 @@
 """
 Project API routes.
 """
+from datetime import datetime
 from typing import List
-from dependencies import get_project_service
-from fastapi import APIRouter, HTTPException, status, Query, Depends
-from models.project import ProjectCreate, ProjectUpdate, ProjectResponse
+from dependencies import get_activity_service, get_project_service, with_deadline
+from fastapi import APIRouter, HTTPException, status, Query, Depends, Response
+from models.project import (
+    ProjectCreate, ProjectUpdate, ProjectResponse, ProjectBulkUpdate, ProjectBulkUpdateResponse
+)
+from models.count import CountResponse
+from models.activity import ProjectEvent
+from models.timestamps import to_local_naive
+from services.activity_service import ActivityService
 from services.project_service import ProjectService
+from settings import config
 
 
 router = APIRouter(
@@ -13,16 +21,42 @@ router = APIRouter(
     tags=["projects"]
 )
 
+# List endpoints scan the most rows, so give up on them sooner than the default deadline
+LIST_DEADLINE_SECONDS = 5.0
+
 
-@router.get("", response_model=List[ProjectResponse])
+@router.get(
+    "",
+    response_model=List[ProjectResponse],
+    dependencies=[Depends(with_deadline(LIST_DEADLINE_SECONDS))]
+)
 async def get_projects(
     owner_id: int = Query(None, description="Filter by owner ID"), 
+    project_status: str = Query(
+        None, alias="status", pattern="^(active|completed|archived)$", description="Filter by status"
+    ),
     service: ProjectService = Depends(get_project_service)
 ):
-    """Get all projects, optionally filtered by owner"""
+    """Get all projects, optionally filtered by owner and status"""
+    if config.db_json_rendering:
+        body = await service.get_projects_json(owner_id or None, project_status)
+        return Response(content=body, media_type="application/json")
     if owner_id:
-        return await service.get_projects_by_owner(owner_id)
-    return await service.get_all_projects()
+        return await service.get_projects_by_owner(owner_id, project_status)
+    return await service.get_all_projects(project_status)
+
+
+@router.get("/count", response_model=CountResponse)
+async def count_projects(
+    owner_id: int = Query(None, description="Filter by owner ID"),
+    project_status: str = Query(
+        None, alias="status", pattern="^(active|completed|archived)$", description="Filter by status"
+    ),
+    exact: bool = Query(False, description="Run an exact COUNT(*) instead of estimating"),
+    service: ProjectService = Depends(get_project_service)
+):
+    """Get the total number of projects, estimated unless exact=true"""
+    return await service.count_projects(owner_id, project_status, exact)
 
 
 @router.get("/{project_id}", response_model=ProjectResponse)
@@ -40,6 +74,17 @@ async def get_project(
     return project
 
 
+@router.get("/{project_id}/activity", response_model=List[ProjectEvent])
+async def get_project_activity(
+    project_id: int,
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of events"),
+    before: datetime = Query(None, description="Only events before this time, for paging"),
+    service: ActivityService = Depends(get_activity_service)
+):
+    """Get a project's activity, newest first"""
+    return await service.get_project_activity(project_id, limit, to_local_naive(before))
+
+
 @router.post("", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
 async def create_project(
     project_data: ProjectCreate, 
@@ -49,6 +94,22 @@ async def create_project(
     return await service.create_project(project_data)
 
 
+@router.patch("", response_model=ProjectBulkUpdateResponse)
+async def bulk_update_projects(
+    bulk: ProjectBulkUpdate,
+    returning: bool = Query(False, description="Return the updated projects instead of only a count"),
+    service: ProjectService = Depends(get_project_service)
+):
+    """Update every project matching the given IDs and/or filters"""
+    result = await service.bulk_update_projects(bulk, returning)
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Selection matches more than {config.project_bulk_update_max_rows} projects; narrow the filter"
+        )
+    return result
+
+
 @router.put("/{project_id}", response_model=ProjectResponse)
 async def update_project(
     project_id: int, 
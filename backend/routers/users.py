@@ -2,25 +2,56 @@
 User API routes.
 """
 from typing import List
-from fastapi import APIRouter, HTTPException, status, Depends
-from models.user import UserCreate, UserUpdate, UserResponse
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Response
+from fastapi.responses import JSONResponse
+from models.user import UserCreate, UserUpdate, UserResponse, UserDeletionStatus
+from models.count import CountResponse
 from services.user_service import UserService
-from dependencies import get_user_service
+from dependencies import get_user_service, with_deadline
+from settings import config
 
 router = APIRouter(
     prefix="/users",
     tags=["users"]
 )
 
+# List endpoints scan the most rows, so give up on them sooner than the default deadline
+LIST_DEADLINE_SECONDS = 5.0
 
-@router.get("", response_model=List[UserResponse])
+
+@router.get(
+    "",
+    response_model=List[UserResponse],
+    dependencies=[Depends(with_deadline(LIST_DEADLINE_SECONDS))]
+)
 async def get_users(
     service: UserService = Depends(get_user_service)
 ):
     """Get all users"""
+    if config.db_json_rendering:
+        return Response(content=await service.get_all_users_json(), media_type="application/json")
     return await service.get_all_users()
 
 
+@router.get("/count", response_model=CountResponse)
+async def count_users(
+    exact: bool = Query(False, description="Run an exact COUNT(*) instead of estimating"),
+    service: UserService = Depends(get_user_service)
+):
+    """Get the total number of users, estimated unless exact=true"""
+    return await service.count_users(exact)
+
+
+@router.get("/search", response_model=List[UserResponse])
+async def search_users(
+    q: str = Query(..., min_length=1, max_length=100, description="Username, email or name fragment"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of matches"),
+    service: UserService = Depends(get_user_service)
+):
+    """Search users by prefix or fuzzy match, best matches first"""
+    return await service.search_users(q, limit)
+
+
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: int,
@@ -63,9 +94,19 @@ async def update_user(
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(
     user_id: int,
+    background: bool = Query(False, description="Tombstone now and delete projects in batches"),
     service: UserService = Depends(get_user_service)
 ):
     """Delete a user"""
+    if background:
+        deletion = await service.delete_user_in_background(user_id)
+        if not deletion:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"User with id {user_id} not found"
+            )
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=deletion.model_dump())
+    
     success = await service.delete_user(user_id)
     if not success:
         raise HTTPException(
@@ -74,3 +115,18 @@ async def delete_user(
         )
     return None
 
+
+
+@router.get("/{user_id}/deletion", response_model=UserDeletionStatus)
+async def get_user_deletion(
+    user_id: int,
+    service: UserService = Depends(get_user_service)
+):
+    """Get the progress of a background user deletion"""
+    deletion = await service.get_deletion_status(user_id)
+    if not deletion:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No deletion found for user {user_id}"
+        )
+    return deletion
@@ -3,9 +3,13 @@ Services package for business logic.
 """
 from services.user_service import UserService
 from services.project_service import ProjectService
+from services.dashboard_service import DashboardService
+from services.activity_service import ActivityService
 
 __all__ = [
     "UserService",
     "ProjectService",
+    "DashboardService",
+    "ActivityService",
 ]
 
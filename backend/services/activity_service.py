@@ -0,0 +1,201 @@
+"""
+Project activity log.
+Project writes record events in memory; a background writer appends them to the
+append-only project_events table in batches with COPY, so writes never wait on the log.
+"""
+import asyncio
+import contextvars
+import json
+from datetime import datetime, timedelta
+from typing import Any, Optional
+import asyncpg
+from models.activity import ProjectEvent
+from database.databridge import DataBridge
+from services.mappers import event_from_row
+from settings import AppConfig, get_settings
+
+
+EVENT_COLUMNS = ["occurred_at", "project_id", "event_type", "owner_id", "changes"]
+
+EVENT_SELECT = f"SELECT {', '.join(EVENT_COLUMNS)} FROM project_events"
+
+# get_activity reads backwards from `until` in windows starting at this size, doubling
+# each time one comes up short, so no single query sorts an unbounded range
+ACTIVITY_SCAN_WINDOW = timedelta(minutes=5)
+
+# Errors that mean the database refused the events themselves, so some event in the batch is bad.
+# Anything else (lost connections, shutdowns, cancelled statements) says nothing about the events.
+REJECTED_EVENT_ERRORS = (asyncpg.DataError, asyncpg.IntegrityConstraintViolationError)
+
+
+class ActivityService:
+    """Buffered writer and time-range reads for project events"""
+
+    def __init__(self, db: DataBridge, settings: Optional[AppConfig] = None):
+        self.db = db
+        settings = settings or get_settings()
+        self.flush_interval = settings.activity_flush_interval_ms / 1000
+        self.batch_size = settings.activity_flush_batch_size
+        self.max_buffered = settings.activity_max_buffered
+        self.max_flush_attempts = settings.activity_max_flush_attempts
+        self.stats = {"written": 0, "dropped": 0, "rejected": 0, "failed_flushes": 0}
+        self._rejections = 0  # Consecutive times the database refused the batch at the front
+        self._buffer: list[tuple] = []
+        self._batch_ready = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+
+    def record(
+        self,
+        project_id: int,
+        event_type: str,
+        owner_id: Optional[int] = None,
+        changes: Optional[dict[str, Any]] = None
+    ):
+        """
+        Buffer one event; never waits on the database.
+        The writer starts on the first event, like the pool connects on the first query.
+        """
+        if len(self._buffer) >= self.max_buffered:
+            self.stats["dropped"] += 1
+            return
+        self._buffer.append((
+            datetime.now(),
+            project_id,
+            event_type,
+            owner_id,
+            json.dumps(changes, default=str) if changes else None
+        ))
+        if self._writer is None:
+            # Outside the request's context, so its deadline doesn't apply to flushes
+            self._writer = asyncio.create_task(self._run(), context=contextvars.Context())
+        if len(self._buffer) >= self.batch_size:
+            self._batch_ready.set()
+
+    async def _run(self):
+        """Flush every flush_interval, or as soon as a full batch is buffered"""
+        while True:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                # Events stay buffered and are retried on the next pass
+                self.stats["failed_flushes"] += 1
+                print(f"❌ Activity log flush failed: {e}")
+
+    async def flush(self):
+        """
+        COPY buffered events into project_events, one batch at a time.
+        Connection and server failures leave the batch buffered for the next pass. A batch
+        the database refuses as bad data max_flush_attempts times in a row is bisected,
+        so one bad event can't block the log.
+        """
+        while self._buffer:
+            batch = self._buffer[:self.batch_size]
+            if self._rejections >= self.max_flush_attempts:
+                await self._flush_bisecting(batch)
+                self._rejections = 0
+                continue
+            try:
+                await self._copy(batch)
+            except REJECTED_EVENT_ERRORS:
+                self._rejections += 1
+                raise
+            self._rejections = 0
+            # record() only appends, so the flushed batch is still at the front
+            del self._buffer[:len(batch)]
+            self.stats["written"] += len(batch)
+
+    async def _flush_bisecting(self, batch: list[tuple]):
+        """
+        Write a refused batch in halves down to single events, dropping those still refused.
+        Any other error stops the bisection with the unwritten events still buffered.
+        """
+        try:
+            await self._copy(batch)
+        except REJECTED_EVENT_ERRORS as e:
+            if len(batch) == 1:
+                print(f"❌ Activity event rejected, dropping it: {e}")
+                self.stats["rejected"] += 1
+                del self._buffer[:1]
+                return
+            middle = len(batch) // 2
+            await self._flush_bisecting(batch[:middle])
+            await self._flush_bisecting(batch[middle:])
+            return
+        # Halves are written left to right, so each one is at the front when it succeeds
+        del self._buffer[:len(batch)]
+        self.stats["written"] += len(batch)
+
+    async def _copy(self, batch: list[tuple]):
+        async with self.db.get_connection() as conn:
+            await conn.copy_records_to_table("project_events", records=batch, columns=EVENT_COLUMNS)
+
+    async def stop(self):
+        """Stop the writer and flush whatever is still buffered"""
+        if self._writer:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+            self._writer = None
+        await self.flush()
+
+    async def get_project_activity(
+        self,
+        project_id: int,
+        limit: int = 50,
+        before: Optional[datetime] = None
+    ) -> list[ProjectEvent]:
+        """
+        Newest events for one project, paging backwards with `before`.
+        Served by the (project_id, occurred_at) index, so cost is independent of log size.
+        """
+        rows = await self.db.fetch_all(
+            f"""
+            {EVENT_SELECT}
+            WHERE project_id = $1 AND occurred_at < $2
+            ORDER BY occurred_at DESC
+            LIMIT $3
+            """,
+            project_id,
+            before or datetime.max,
+            limit
+        )
+        return [event_from_row(row) for row in rows]
+
+    async def get_activity(
+        self,
+        since: datetime,
+        until: Optional[datetime] = None,
+        limit: int = 100
+    ) -> list[ProjectEvent]:
+        """
+        Newest events across all projects within [since, until).
+        A BRIN index can't return rows in order, so each query sorts its whole range;
+        reading backwards in growing windows stops as soon as `limit` events are found,
+        instead of sorting everything since `since`.
+        """
+        rows = []
+        upper = until or datetime.now()
+        window = ACTIVITY_SCAN_WINDOW
+        while len(rows) < limit and upper > since:
+            lower = max(since, upper - window)
+            rows += await self.db.fetch_all(
+                f"""
+                {EVENT_SELECT}
+                WHERE occurred_at >= $1 AND occurred_at < $2
+                ORDER BY occurred_at DESC
+                LIMIT $3
+                """,
+                lower,
+                upper,
+                limit - len(rows)
+            )
+            upper = lower
+            window *= 2
+        return [event_from_row(row) for row in rows]
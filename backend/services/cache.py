@@ -0,0 +1,64 @@
+"""
+Small in-process caches shared by the services.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Bounded cache whose entries expire a fixed number of seconds after being set.
+    Least recently used entries are evicted first once max_entries is reached.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        """Cache a value for ttl_seconds"""
+        self._entries.pop(key, None)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every entry"""
+        self._entries.clear()
+
+
+class DataVersions:
+    """
+    Per-resource version counters, bumped by service writes.
+    Caches include the versions they read in their keys, so a bump makes
+    every older entry unreachable without tracking which entries it affects.
+    Counters are per process: other workers' writes are only seen once
+    entries expire.
+    """
+
+    def __init__(self):
+        self._versions: dict[str, int] = {}
+
+    def get(self, resource: str) -> int:
+        return self._versions.get(resource, 0)
+
+    def bump(self, *resources: str):
+        for resource in resources:
+            self._versions[resource] = self._versions.get(resource, 0) + 1
+
+
+data_versions = DataVersions()
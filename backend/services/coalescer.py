@@ -0,0 +1,95 @@
+"""
+Group commit for single-row writes.
+Concurrent callers are merged into one batched write; each caller still awaits
+its own result or its own error, up to its request deadline.
+"""
+import asyncio
+import contextvars
+from typing import Any, Awaitable, Callable, Optional
+import asyncpg
+from database.databridge import remaining_deadline
+
+
+class WriteCoalescer:
+    """
+    Collects submitted items and writes them together with `write_batch`, which takes
+    a list of items and returns one result per item, in order.
+    A batch is written once max_batch items are waiting, or window_seconds after the
+    first item of the batch arrived, whichever comes first.
+    A caller that times out or is cancelled stops waiting, but its item is still written,
+    so anything that must follow a write belongs in `write_batch`, not after submit().
+    """
+
+    def __init__(
+        self,
+        write_batch: Callable[[list], Awaitable[list]],
+        window_seconds: float,
+        max_batch: int,
+    ):
+        self.write_batch = write_batch
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+        self.stats = {"batches": 0, "items": 0, "split_batches": 0}
+        self._pending: list[tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: set[asyncio.Task] = set()
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item for the next batch and wait for its result until the request deadline"""
+        timeout = remaining_deadline()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self._start_flush)
+        return await asyncio.wait_for(future, timeout)
+
+    def _start_flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        # Run outside any caller's context: one request's deadline or disconnect
+        # must not fail the writes of the others in its batch
+        task = asyncio.create_task(self._flush(batch), context=contextvars.Context())
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: list[tuple[Any, asyncio.Future]]):
+        self.stats["batches"] += 1
+        self.stats["items"] += len(batch)
+        await self._write(batch)
+
+    async def _write(self, batch: list[tuple[Any, asyncio.Future]]):
+        try:
+            results = await self.write_batch([item for item, _ in batch])
+        except asyncpg.PostgresError as e:
+            if len(batch) > 1:
+                # One bad row fails the whole statement; write each row alone so
+                # only its own caller sees the error
+                self.stats["split_batches"] += 1
+                await asyncio.gather(*(self._write([entry]) for entry in batch))
+            else:
+                _resolve(batch[0][1], error=e)
+            return
+        except Exception as e:
+            for _, future in batch:
+                _resolve(future, error=e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            _resolve(future, result=result)
+
+
+def _resolve(future: asyncio.Future, result: Any = None, error: Optional[BaseException] = None):
+    """Complete a caller's future unless the caller already gave up on it"""
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
@@ -0,0 +1,69 @@
+"""
+Dashboard service for business logic.
+Builds the combined users/projects overview from concurrent queries.
+"""
+import asyncio
+from models.dashboard import DashboardResponse
+from database.databridge import DataBridge
+from database.queries import PROJECT_STATUS_COUNTS, USER_COLUMNS, project_list
+from services.mappers import project_from_row, user_from_row
+from services.project_service import ProjectService
+from services.sharded_project_service import ShardedProjectService
+
+
+PROJECT_STATUSES = ("active", "completed", "archived")
+
+
+class DashboardService:
+    """Service layer for the dashboard"""
+
+    def __init__(self, db: DataBridge, project_service: ProjectService):
+        self.db = db
+        self.project_service = project_service
+
+    async def get_dashboard(self, recent_limit: int = 10) -> DashboardResponse:
+        """
+        Get users, the most recent projects and per-status project counts.
+        The three queries run concurrently on separate connections, sharing one snapshot,
+        so wall time is close to the slowest query and the numbers agree with each other.
+        """
+        if isinstance(self.project_service, ShardedProjectService):
+            return await self._get_sharded_dashboard(recent_limit)
+
+        users, projects, counts = await self.db.gather_in_snapshot(
+            (
+                "fetch_all",
+                f"SELECT {USER_COLUMNS} FROM users WHERE deleted_at IS NULL ORDER BY created_at DESC",
+                ()
+            ),
+            ("fetch_all", f"{project_list(())} LIMIT $1", (recent_limit,)),
+            ("fetch_all", PROJECT_STATUS_COUNTS, ()),
+        )
+        return DashboardResponse(
+            users=[user_from_row(row) for row in users],
+            recent_projects=[project_from_row(row) for row in projects],
+            project_counts={
+                **{status: 0 for status in PROJECT_STATUSES},
+                **{row['status']: row['count'] for row in counts},
+            }
+        )
+
+    async def _get_sharded_dashboard(self, recent_limit: int) -> DashboardResponse:
+        """
+        Projects span several databases, so there is no shared snapshot;
+        the queries still run concurrently.
+        """
+        users, projects, *counts = await asyncio.gather(
+            self.db.fetch_all(
+                f"SELECT {USER_COLUMNS} FROM users WHERE deleted_at IS NULL ORDER BY created_at DESC"
+            ),
+            self.project_service.get_recent_projects(recent_limit),
+            *(self.project_service.count_projects(status=status) for status in PROJECT_STATUSES)
+        )
+        return DashboardResponse(
+            users=[user_from_row(row) for row in users],
+            recent_projects=projects,
+            project_counts={
+                status: count.count for status, count in zip(PROJECT_STATUSES, counts)
+            }
+        )
@@ -0,0 +1,67 @@
+"""
+Row mappers that turn database rows into response models.
+One mapper is generated per model and shared by every query that returns that shape.
+"""
+import json
+from datetime import datetime
+from typing import Any, Callable, TypeVar
+from pydantic import BaseModel
+from models.activity import ProjectEvent
+from models.project import ProjectResponse
+from models.user import UserResponse
+
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def iso_timestamp(column: str) -> Callable[[dict], str]:
+    """Read a timestamp column as an ISO string, defaulting to now when it is NULL"""
+    def read(row: dict) -> str:
+        value = row[column]
+        return value.isoformat() if value else datetime.now().isoformat()
+    return read
+
+
+def build_row_mapper(
+    model: type[ModelT], **computed: Callable[[dict], Any]
+) -> Callable[..., ModelT]:
+    """
+    Generate a row -> model function for `model`.
+    Fields in `computed` are derived from the row; the rest are copied by name.
+    Keyword overrides passed to the mapper win over both.
+    Rows come from our own schema, so validation is skipped here; FastAPI still
+    validates the response model on the way out.
+    """
+    copied = tuple(name for name in model.model_fields if name not in computed)
+    derived = tuple(computed.items())
+
+    def map_row(row: dict, **overrides) -> ModelT:
+        values = {name: row[name] for name in copied}
+        for name, read in derived:
+            values[name] = read(row)
+        values.update(overrides)
+        return model.model_construct(**values)
+
+    return map_row
+
+
+project_from_row = build_row_mapper(
+    ProjectResponse,
+    owner_name=lambda row: row['owner_name'] or "Unknown",
+    created_at=iso_timestamp('created_at'),
+    updated_at=iso_timestamp('updated_at'),
+)
+
+user_from_row = build_row_mapper(
+    UserResponse,
+    name=lambda row: row['full_name'] or row['username'],
+    role=lambda row: "user",  # Default role, can be updated when role column is added
+    is_active=lambda row: True,  # Default active, can be updated when is_active column is added
+    created_at=iso_timestamp('created_at'),
+)
+
+event_from_row = build_row_mapper(
+    ProjectEvent,
+    changes=lambda row: json.loads(row['changes']) if row['changes'] else None,
+    occurred_at=iso_timestamp('occurred_at'),
+)
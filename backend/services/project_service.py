@@ -4,113 +4,128 @@ Handles project-related operations and calls the databridge.
 """
 from typing import Optional
 from datetime import datetime
-from models.project import Project, ProjectCreate, ProjectUpdate, ProjectResponse
+from models.project import (
+    Project, ProjectCreate, ProjectUpdate, ProjectResponse, ProjectBulkUpdate,
+    ProjectBulkUpdateResponse
+)
+from models.count import CountResponse
+from services.activity_service import ActivityService
+from services.cache import TTLCache, data_versions
+from services.coalescer import WriteCoalescer
+from services.mappers import project_from_row
+from database.databridge import remaining_deadline
+from database.queries import (
+    PROJECT_SELECT, PROJECT_DELETE, PROJECT_INSERT, PROJECT_INSERT_MANY, project_bulk_ids, project_bulk_update, project_count,
+    project_list, project_list_json, project_update
+)
+from settings import AppConfig, get_settings
+
+
+def project_filters(owner_id: Optional[int] = None, status: Optional[str] = None) -> dict:
+    """Non-empty list filters as {column: value}, in the order the compiled queries expect"""
+    filters = {"owner_id": owner_id, "status": status}
+    return {column: value for column, value in filters.items() if value is not None}
 
 
 class ProjectService:
     """Service layer for project operations"""
 
-    def __init__(self, db):
+    def __init__(
+        self,
+        db,
+        settings: Optional[AppConfig] = None,
+        activity: Optional[ActivityService] = None
+    ):
         self.db = db
+        self.activity = activity  # Receives an event for every successful write
+        settings = settings or get_settings()
+        self._count_cache = TTLCache(settings.count_cache_ttl_seconds)
+        self._create_coalescer = None
+        if settings.project_write_coalescing:
+            self._create_coalescer = WriteCoalescer(
+                self._insert_projects,
+                settings.project_write_coalesce_window_ms / 1000,
+                settings.project_write_coalesce_max_batch
+            )
     
-    async def get_all_projects(self) -> list[ProjectResponse]:
+    def _on_write(self, project_id: int, event_type: str, owner_id: Optional[int], changes: Optional[dict] = None):
         """
-        Get all projects from the database.
+        Note a successful project write: invalidate cached responses and
+        buffer an activity event, when the activity log is enabled.
         """
-        query = """
-        SELECT p.id, p.name, p.description, p.status, p.owner_id, 
-               p.created_at, p.updated_at, u.full_name as owner_name
-        FROM projects p
-        LEFT JOIN users u ON p.owner_id = u.id
-        ORDER BY p.created_at DESC
-        """
-        rows = await self.db.fetch_all(query)
-        
-        projects = []
-        for row in rows:
-            project = ProjectResponse(
-                id=row['id'],
-                name=row['name'],
-                description=row['description'],
-                status=row['status'],
-                owner_id=row['owner_id'],
-                owner_name=row['owner_name'] if row['owner_name'] else "Unknown",
-                created_at=row['created_at'].isoformat() if row['created_at'] else datetime.now().isoformat(),
-                updated_at=row['updated_at'].isoformat() if row['updated_at'] else datetime.now().isoformat()
-            )
-            projects.append(project)
+        data_versions.bump("projects")
+        if self.activity:
+            self.activity.record(project_id, event_type, owner_id, changes)
+    
+    async def count_projects(
+        self,
+        owner_id: Optional[int] = None,
+        status: Optional[str] = None,
+        exact: bool = False
+    ) -> CountResponse:
+        """
+        Count projects. Unfiltered totals come from the planner estimate,
+        filtered totals from a short-TTL cache; exact=True always runs COUNT(*).
+        """
+        if not exact:
+            if owner_id is None and status is None:
+                estimate = await self.db.estimate_count("projects")
+                if estimate is not None:
+                    return CountResponse(count=estimate, exact=False)
+            else:
+                cached = self._count_cache.get((owner_id, status))
+                if cached is not None:
+                    return CountResponse(count=cached, exact=False)
         
-        return projects
+        filters = project_filters(owner_id, status)
+        count = await self.db.fetch_val(project_count(tuple(filters)), *filters.values())
+        self._count_cache.set((owner_id, status), count)
+        return CountResponse(count=count, exact=True)
+    
+    async def get_all_projects(self, status: Optional[str] = None) -> list[ProjectResponse]:
+        """
+        Get all projects from the database, optionally only those with a given status.
+        Filtering on status lets the planner skip the other status partitions.
+        """
+        filters = project_filters(status=status)
+        rows = await self.db.fetch_all(project_list(tuple(filters)), *filters.values())
+        return [project_from_row(row) for row in rows]
+    
+    async def get_projects_json(self, owner_id: Optional[int] = None, status: Optional[str] = None) -> str:
+        """
+        Same list as get_all_projects/get_projects_by_owner, rendered by Postgres into the
+        final JSON response body. No rows or models are built in Python.
+        """
+        filters = project_filters(owner_id, status)
+        return await self.db.fetch_val(project_list_json(tuple(filters)), *filters.values())
     
     async def get_project_by_id(self, project_id: int) -> Optional[ProjectResponse]:
         """
         Get a project by ID from the database.
         """
-        query = """
-        SELECT p.id, p.name, p.description, p.status, p.owner_id, 
-               p.created_at, p.updated_at, u.full_name as owner_name
-        FROM projects p
-        LEFT JOIN users u ON p.owner_id = u.id
-        WHERE p.id = $1
+        query = f"""
+        {PROJECT_SELECT}
+        WHERE p.id = $1 AND u.deleted_at IS NULL
         """
         row = await self.db.fetch_one(query, project_id)
-        
-        if not row:
-            return None
-            
-        return ProjectResponse(
-            id=row['id'],
-            name=row['name'],
-            description=row['description'],
-            status=row['status'],
-            owner_id=row['owner_id'],
-            owner_name=row['owner_name'] if row['owner_name'] else "Unknown",
-            created_at=row['created_at'].isoformat() if row['created_at'] else datetime.now().isoformat(),
-            updated_at=row['updated_at'].isoformat() if row['updated_at'] else datetime.now().isoformat()
-        )
+        return project_from_row(row) if row else None
     
-    async def get_projects_by_owner(self, owner_id: int) -> list[ProjectResponse]:
+    async def get_projects_by_owner(self, owner_id: int, status: Optional[str] = None) -> list[ProjectResponse]:
         """
         Get all projects owned by a specific user from the database.
         """
-        query = """
-        SELECT p.id, p.name, p.description, p.status, p.owner_id, 
-               p.created_at, p.updated_at, u.full_name as owner_name
-        FROM projects p
-        LEFT JOIN users u ON p.owner_id = u.id
-        WHERE p.owner_id = $1
-        ORDER BY p.created_at DESC
-        """
-        rows = await self.db.fetch_all(query, owner_id)
-        
-        projects = []
-        for row in rows:
-            project = ProjectResponse(
-                id=row['id'],
-                name=row['name'],
-                description=row['description'],
-                status=row['status'],
-                owner_id=row['owner_id'],
-                owner_name=row['owner_name'] if row['owner_name'] else "Unknown",
-                created_at=row['created_at'].isoformat() if row['created_at'] else datetime.now().isoformat(),
-                updated_at=row['updated_at'].isoformat() if row['updated_at'] else datetime.now().isoformat()
-            )
-            projects.append(project)
-        
-        return projects
+        filters = project_filters(owner_id, status)
+        rows = await self.db.fetch_all(project_list(tuple(filters)), *filters.values())
+        return [project_from_row(row) for row in rows]
     
     async def create_project(self, project_data: ProjectCreate) -> ProjectResponse:
         """
         Create a new project in the database.
-        """
-        query = """
-        INSERT INTO projects (name, description, status, owner_id, created_at, updated_at)
-        VALUES ($1, $2, $3, $4, $5, $6)
-        RETURNING id, name, description, status, owner_id, created_at, updated_at
+        The owner's name is joined in the same statement. With PROJECT_WRITE_COALESCING,
+        concurrent creates are batched into one multi-row INSERT.
         """
         now = datetime.now()
-        row = await self.db.fetch_one(
-            query,
+        values = (
             project_data.name,
             project_data.description,
             getattr(project_data, 'status', 'active'),  # Default status
@@ -118,90 +133,100 @@ class ProjectService:
             now,
             now
         )
-        
-        # Get owner name
-        owner_query = "SELECT full_name FROM users WHERE id = $1"
-        owner_row = await self.db.fetch_one(owner_query, project_data.owner_id)
-        owner_name = owner_row['full_name'] if owner_row and owner_row['full_name'] else "Unknown"
-        
-        return ProjectResponse(
-            id=row['id'],
-            name=row['name'],
-            description=row['description'],
-            status=row['status'],
-            owner_id=row['owner_id'],
-            owner_name=owner_name,
-            created_at=row['created_at'].isoformat() if row['created_at'] else now.isoformat(),
-            updated_at=row['updated_at'].isoformat() if row['updated_at'] else now.isoformat()
-        )
+        if self._create_coalescer:
+            return project_from_row(await self._create_coalescer.submit(values))
+        row = await self.db.fetch_one(PROJECT_INSERT, *values)
+        self._on_created(row)
+        return project_from_row(row)
+    
+    async def _insert_projects(self, batch: list[tuple]) -> list[dict]:
+        """
+        Insert a batch of create_project values in one statement, rows in input order.
+        Write hooks run here, for every inserted row, so they also fire for callers
+        that stopped waiting on the coalescer.
+        """
+        columns = [list(column) for column in zip(*batch)]
+        rows = await self.db.fetch_all(PROJECT_INSERT_MANY, *columns)
+        for row in rows:
+            self._on_created(row)
+        return rows
+    
+    def _on_created(self, row: dict):
+        self._on_write(row['id'], "created", row['owner_id'], {"name": row['name'], "status": row['status']})
     
     async def update_project(self, project_id: int, project_data: ProjectUpdate) -> Optional[ProjectResponse]:
         """
         Update a project in the database.
+        Only the provided fields are set; the statement for each combination of
+        fields is compiled once and returns the owner's name in the same round trip.
         """
-        # Build dynamic update query based on provided fields
-        update_fields = []
-        values = []
-        param_count = 1
+        updates = project_data.model_dump(exclude_none=True)
         
-        if hasattr(project_data, 'name') and project_data.name is not None:
-            update_fields.append(f"name = ${param_count}")
-            values.append(project_data.name)
-            param_count += 1
-            
-        if hasattr(project_data, 'description') and project_data.description is not None:
-            update_fields.append(f"description = ${param_count}")
-            values.append(project_data.description)
-            param_count += 1
-            
-        if hasattr(project_data, 'status') and project_data.status is not None:
-            update_fields.append(f"status = ${param_count}")
-            values.append(project_data.status)
-            param_count += 1
-        
-        if not update_fields:
+        if not updates:
             # No fields to update, return current project
             return await self.get_project_by_id(project_id)
-            
-        update_fields.append(f"updated_at = ${param_count}")
-        values.append(datetime.now())
-        values.append(project_id)  # Add project_id for WHERE clause
-        
-        query = f"""
-        UPDATE projects 
-        SET {', '.join(update_fields)}
-        WHERE id = ${param_count + 1}
-        RETURNING id, name, description, status, owner_id, created_at, updated_at
-        """
-        
-        row = await self.db.fetch_one(query, *values)
         
+        columns = tuple(updates)
+        row = await self.db.fetch_one(
+            project_update(columns),
+            *updates.values(),
+            datetime.now(),
+            project_id
+        )
         if not row:
             return None
-            
-        # Get owner name
-        owner_query = "SELECT full_name FROM users WHERE id = $1"
-        owner_row = await self.db.fetch_one(owner_query, row['owner_id'])
-        owner_name = owner_row['full_name'] if owner_row and owner_row['full_name'] else "Unknown"
+        self._on_write(project_id, "updated", row['owner_id'], updates)
+        return project_from_row(row)
+    
+    async def bulk_update_projects(
+        self,
+        bulk: ProjectBulkUpdate,
+        returning: bool = False
+    ) -> Optional[ProjectBulkUpdateResponse]:
+        """
+        Apply one partial update to every selected project with a single set-based UPDATE.
+        The matching IDs are locked first, at most PROJECT_BULK_UPDATE_MAX_ROWS + 1 of them;
+        returns None without writing anything when the selection is larger than the limit.
+        """
+        max_rows = get_settings().project_bulk_update_max_rows
+        selection = bulk.selection()
+        updates = bulk.update.model_dump(exclude_none=True)
         
-        return ProjectResponse(
-            id=row['id'],
-            name=row['name'],
-            description=row['description'],
-            status=row['status'],
-            owner_id=row['owner_id'],
-            owner_name=owner_name,
-            created_at=row['created_at'].isoformat() if row['created_at'] else datetime.now().isoformat(),
-            updated_at=row['updated_at'].isoformat() if row['updated_at'] else datetime.now().isoformat()
-        )
+        async with self.db.get_connection(timeout=remaining_deadline()) as conn:
+            async with conn.transaction():
+                targets = await conn.fetch(
+                    project_bulk_ids(tuple(selection)),
+                    *selection.values(),
+                    max_rows + 1,
+                    timeout=remaining_deadline()
+                )
+                if len(targets) > max_rows:
+                    return None
+                
+                ids = [row['id'] for row in targets]
+                query = project_bulk_update(tuple(updates), returning)
+                args = (*updates.values(), datetime.now(), ids)
+                if returning:
+                    rows = await conn.fetch(query, *args, timeout=remaining_deadline())
+                    projects = [project_from_row(dict(row)) for row in rows]
+                    response = ProjectBulkUpdateResponse(count=len(projects), projects=projects)
+                else:
+                    result = await conn.execute(query, *args, timeout=remaining_deadline())
+                    response = ProjectBulkUpdateResponse(count=int(result.split()[-1]))
+        
+        for row in targets:
+            self._on_write(row['id'], "updated", row['owner_id'], updates)
+        return response
     
     async def delete_project(self, project_id: int) -> bool:
         """
         Delete a project from the database.
         """
-        query = "DELETE FROM projects WHERE id = $1"
-        result = await self.db.execute(query, project_id)
+        row = await self.db.fetch_one(PROJECT_DELETE, project_id)
         
         # Check if any rows were affected
-        return "DELETE 1" in result
+        if not row:
+            return False
+        self._on_write(project_id, "deleted", row['owner_id'])
+        return True
 
@@ -0,0 +1,254 @@
+"""
+Project service for sharded deployments.
+Projects live on owner-keyed shards; owner names and tombstones come from the main database.
+"""
+import asyncio
+import heapq
+import json
+from datetime import datetime
+from typing import Optional
+from models.project import (
+    ProjectCreate, ProjectUpdate, ProjectResponse, ProjectBulkUpdate, ProjectBulkUpdateResponse
+)
+from models.count import CountResponse
+from database.databridge import DataBridge
+from database.queries import (
+    PROJECT_DELETE, SHARD_PROJECT_SELECT, SHARD_PROJECT_INSERT, project_bulk_ids, shard_project_bulk_update,
+    shard_project_count, shard_project_list, shard_project_update
+)
+from database.shards import ShardRouter
+from services.activity_service import ActivityService
+from services.mappers import project_from_row
+from services.project_service import ProjectService, project_filters
+from settings import get_settings
+
+
+OWNERS_QUERY = "SELECT id, full_name, deleted_at FROM users WHERE id = ANY($1::int[])"
+
+
+class ShardedProjectService(ProjectService):
+    """Service layer for project operations across shards"""
+
+    def __init__(self, db: DataBridge, shards: ShardRouter, activity: Optional[ActivityService] = None):
+        super().__init__(db, activity=activity)
+        self.shards = shards
+
+    async def _with_owners(self, rows: list[dict]) -> list[ProjectResponse]:
+        """Attach owner names from the main database, dropping projects of tombstoned owners"""
+        owner_ids = list({row['owner_id'] for row in rows})
+        owners = await self.db.fetch_all(OWNERS_QUERY, owner_ids) if owner_ids else []
+        return self._attach_owners(rows, owners)
+
+    def _attach_owners(self, rows: list[dict], owners: list[dict]) -> list[ProjectResponse]:
+        by_id = {owner['id']: owner for owner in owners}
+        projects = []
+        for row in rows:
+            owner = by_id.get(row['owner_id'])
+            if owner and owner['deleted_at']:
+                continue
+            projects.append(project_from_row({**row, 'owner_name': owner['full_name'] if owner else None}))
+        return projects
+
+    async def _find_project(self, method: str, query: str, project_id: int, *args) -> Optional[dict]:
+        """Run a by-ID statement on the project's home shard, then on the others if it moved"""
+        home, *others = self.shards.for_project(project_id)
+        row = await getattr(home, method)(query, *args)
+        if row or not others:
+            return row
+        rows = await asyncio.gather(*(getattr(shard, method)(query, *args) for shard in others))
+        return next((row for row in rows if row), None)
+
+    async def get_all_projects(self, status: Optional[str] = None) -> list[ProjectResponse]:
+        """
+        Get all projects, scatter-gathered from every shard.
+        Each shard returns its rows sorted by created_at; they are k-way merged here.
+        """
+        filters = project_filters(status=status)
+        per_shard = await self.shards.scatter(
+            "fetch_all", shard_project_list(tuple(filters)), *filters.values()
+        )
+        merged = heapq.merge(
+            *per_shard, key=lambda row: row['created_at'] or datetime.min, reverse=True
+        )
+        return await self._with_owners(list(merged))
+
+    async def get_recent_projects(self, limit: int) -> list[ProjectResponse]:
+        """
+        The `limit` most recently created projects across shards.
+        Each shard returns only its own newest `limit`; the merged candidates are enough for
+        the result unless projects of tombstoned owners (dropped here) crowd out the rest.
+        """
+        per_shard = await self.shards.scatter("fetch_all", f"{shard_project_list(())} LIMIT $1", limit)
+        merged = heapq.merge(
+            *per_shard, key=lambda row: row['created_at'] or datetime.min, reverse=True
+        )
+        projects = await self._with_owners(list(merged))
+        return projects[:limit]
+
+    async def get_projects_json(self, owner_id: Optional[int] = None, status: Optional[str] = None) -> str:
+        """
+        Shards can't join owner names, so the merged list is rendered here,
+        with the same bytes JSONResponse would produce.
+        """
+        if owner_id:
+            projects = await self.get_projects_by_owner(owner_id, status)
+        else:
+            projects = await self.get_all_projects(status)
+        return json.dumps(
+            [project.model_dump() for project in projects], ensure_ascii=False, separators=(",", ":")
+        )
+
+    async def get_project_by_id(self, project_id: int) -> Optional[ProjectResponse]:
+        """
+        Get a project by ID from its home shard.
+        """
+        row = await self._find_project(
+            "fetch_one", f"{SHARD_PROJECT_SELECT} WHERE id = $1", project_id, project_id
+        )
+        if not row:
+            return None
+        projects = await self._with_owners([row])
+        return projects[0] if projects else None
+
+    async def get_projects_by_owner(self, owner_id: int, status: Optional[str] = None) -> list[ProjectResponse]:
+        """
+        Get all projects owned by a user from the owner's shard.
+        The owner lookup runs concurrently on the main database.
+        """
+        shard = await self.shards.for_owner(owner_id)
+        filters = project_filters(owner_id, status)
+        rows, owners = await asyncio.gather(
+            shard.fetch_all(shard_project_list(tuple(filters)), *filters.values()),
+            self.db.fetch_all(OWNERS_QUERY, [owner_id])
+        )
+        return self._attach_owners(rows, owners)
+
+    async def create_project(self, project_data: ProjectCreate) -> ProjectResponse:
+        """
+        Create a project on the owner's shard.
+        """
+        shard = await self.shards.for_owner(project_data.owner_id)
+        now = datetime.now()
+        row, owners = await asyncio.gather(
+            shard.fetch_one(
+                SHARD_PROJECT_INSERT,
+                project_data.name,
+                project_data.description,
+                getattr(project_data, 'status', 'active'),  # Default status
+                project_data.owner_id,
+                now,
+                now
+            ),
+            self.db.fetch_all(OWNERS_QUERY, [project_data.owner_id])
+        )
+        owner = owners[0] if owners else None
+        self._on_write(row['id'], "created", row['owner_id'], {"name": row['name'], "status": row['status']})
+        return project_from_row({**row, 'owner_name': owner['full_name'] if owner else None})
+
+    async def update_project(self, project_id: int, project_data: ProjectUpdate) -> Optional[ProjectResponse]:
+        """
+        Update a project on its shard.
+        """
+        updates = project_data.model_dump(exclude_none=True)
+
+        if not updates:
+            # No fields to update, return current project
+            return await self.get_project_by_id(project_id)
+
+        row = await self._find_project(
+            "fetch_one",
+            shard_project_update(tuple(updates)),
+            project_id,
+            *updates.values(),
+            datetime.now(),
+            project_id
+        )
+        if not row:
+            return None
+        self._on_write(project_id, "updated", row['owner_id'], updates)
+        projects = await self._with_owners([row])
+        return projects[0] if projects else None
+
+    async def bulk_update_projects(
+        self,
+        bulk: ProjectBulkUpdate,
+        returning: bool = False
+    ) -> Optional[ProjectBulkUpdateResponse]:
+        """
+        Bulk update on the owner's shard, or on every shard without an owner filter.
+        The row limit is checked across all shards before anything is written, but each
+        shard commits its own UPDATE, so the update is not atomic across shards.
+        """
+        max_rows = get_settings().project_bulk_update_max_rows
+        selection = bulk.selection()
+        updates = bulk.update.model_dump(exclude_none=True)
+
+        if bulk.owner_id is not None:
+            shards = [await self.shards.for_owner(bulk.owner_id)]
+        else:
+            shards = list(self.shards.shards.values())
+        per_shard = await asyncio.gather(*(
+            shard.fetch_all(project_bulk_ids(tuple(selection)), *selection.values(), max_rows + 1)
+            for shard in shards
+        ))
+        if sum(len(rows) for rows in per_shard) > max_rows:
+            return None
+
+        now = datetime.now()
+        updated = await asyncio.gather(*(
+            shard.fetch_all(
+                shard_project_bulk_update(tuple(updates)),
+                *updates.values(),
+                now,
+                [row['id'] for row in rows]
+            )
+            for shard, rows in zip(shards, per_shard) if rows
+        ))
+        rows = [row for shard_rows in updated for row in shard_rows]
+        for row in rows:
+            self._on_write(row['id'], "updated", row['owner_id'], updates)
+        if not returning:
+            return ProjectBulkUpdateResponse(count=len(rows))
+        return ProjectBulkUpdateResponse(count=len(rows), projects=await self._with_owners(rows))
+
+    async def delete_project(self, project_id: int) -> bool:
+        """
+        Delete a project from its shard.
+        """
+        row = await self._find_project("fetch_one", PROJECT_DELETE, project_id, project_id)
+        if not row:
+            return False
+        self._on_write(project_id, "deleted", row['owner_id'])
+        return True
+
+    async def count_projects(
+        self,
+        owner_id: Optional[int] = None,
+        status: Optional[str] = None,
+        exact: bool = False
+    ) -> CountResponse:
+        """
+        Count projects across shards. Unfiltered totals sum the shards' planner estimates;
+        counts here don't exclude owners whose deletion is still in progress.
+        """
+        if not exact:
+            if owner_id is None and status is None:
+                estimates = await asyncio.gather(
+                    *(shard.estimate_count("projects") for shard in self.shards.shards.values())
+                )
+                if None not in estimates:
+                    return CountResponse(count=sum(estimates), exact=False)
+            else:
+                cached = self._count_cache.get((owner_id, status))
+                if cached is not None:
+                    return CountResponse(count=cached, exact=False)
+
+        filters = project_filters(owner_id, status)
+        query = shard_project_count(tuple(filters))
+        if owner_id is not None:
+            shard = await self.shards.for_owner(owner_id)
+            count = await shard.fetch_val(query, *filters.values())
+        else:
+            count = sum(await self.shards.scatter("fetch_val", query, *filters.values()))
+        self._count_cache.set((owner_id, status), count)
+        return CountResponse(count=count, exact=True)
@@ -4,35 +4,100 @@ Handles user-related operations and calls the databridge.
 """
 from typing import Optional
 from datetime import datetime
-from models.user import User, UserCreate, UserUpdate, UserResponse
+import asyncio
+import contextvars
+from models.user import User, UserCreate, UserUpdate, UserResponse, UserDeletionStatus
+from models.count import CountResponse
 from database.databridge import DataBridge
+from database.queries import (
+    PROJECT_DELETE_BATCH, USER_COLUMNS, USER_INSERT, USER_LIST_JSON, USER_PREFIX_SEARCH,
+    USER_PURGE_BATCH, USER_PURGE_DELETE, USER_SEARCH, user_update
+)
+from database.shards import ShardRouter
+from services.cache import TTLCache, data_versions
+from services.mappers import user_from_row
+from settings import get_settings
+
+
+# UserUpdate fields that map to user columns, in SET clause order
+USER_UPDATE_COLUMNS = {"name": "full_name", "email": "email"}
+
+# pg_trgm works on three-character sequences; shorter queries use a plain prefix scan
+TRIGRAM_MIN_LENGTH = 3
+
+
+def _like_prefix(text: str) -> str:
+    """LIKE pattern matching values that start with text, wildcards escaped"""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
 
 
 class UserService:
     """Service layer for user operations"""
     
-    def __init__(self, db: DataBridge):
+    def __init__(self, db: DataBridge, shards: Optional[ShardRouter] = None):
         self.db = db
+        self.shards = shards  # Set when projects live on shards instead of the main database
+        self.settings = get_settings()
+        # Background deletions running in this worker, keyed by user ID
+        self._deletion_tasks: dict[int, asyncio.Task] = {}
+        # Autocomplete results keyed by (query, limit); any user write clears it
+        self._search_cache = TTLCache(
+            self.settings.user_search_cache_ttl_seconds, self.settings.user_search_cache_size
+        )
     
     async def get_all_users(self) -> list[UserResponse]:
         """
         Get all users from the database.
         """
-        query = "SELECT id, username, email, full_name, created_at, updated_at FROM users WHERE TRUE ORDER BY created_at DESC"
+        query = f"SELECT {USER_COLUMNS} FROM users WHERE deleted_at IS NULL ORDER BY created_at DESC"
         rows = await self.db.fetch_all(query)
+        return [user_from_row(row) for row in rows]
+    
+    async def get_all_users_json(self) -> str:
+        """
+        Same list as get_all_users, rendered by Postgres into the final JSON response body.
+        """
+        return await self.db.fetch_val(USER_LIST_JSON)
+    
+    async def count_users(self, exact: bool = False) -> CountResponse:
+        """
+        Count users. Uses the planner estimate unless exact=True.
+        """
+        if not exact:
+            estimate = await self.db.estimate_count("users")
+            if estimate is not None:
+                return CountResponse(count=estimate, exact=False)
         
-        users = []
-        for row in rows:
-            user = UserResponse(
-                id=row['id'],
-                email=row['email'],
-                name=row['full_name'] or row['username'],
-                role="user",  # Default role, can be updated when role column is added
-                is_active=True,  # Default active, can be updated when is_active column is added
-                created_at=row['created_at'].isoformat() if row['created_at'] else datetime.now().isoformat()
-            )
-            users.append(user)
+        count = await self.db.fetch_val("SELECT COUNT(*) FROM users WHERE deleted_at IS NULL")
+        return CountResponse(count=count, exact=True)
+    
+    def _on_write(self):
+        """Invalidate search results and cached responses after a user write"""
+        self._search_cache.clear()
+        data_versions.bump("users")
+    
+    async def search_users(self, q: str, limit: int = 10) -> list[UserResponse]:
+        """
+        Prefix and fuzzy match across username, email and full name.
+        Prefix matches rank first, then trigram similarity. Repeated keystroke
+        queries are served from the search cache.
+        """
+        q = q.strip().lower()
+        if not q:
+            return []
         
+        key = (q, limit)
+        cached = self._search_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        if len(q) < TRIGRAM_MIN_LENGTH:
+            successor = q[:-1] + chr(ord(q[-1]) + 1)
+            rows = await self.db.fetch_all(USER_PREFIX_SEARCH, q, successor, limit)
+        else:
+            rows = await self.db.fetch_all(USER_SEARCH, q, _like_prefix(q), limit)
+        users = [user_from_row(row) for row in rows]
+        self._search_cache.set(key, users)
         return users
     
     async def get_user_by_id(self, user_id: int) -> Optional[UserResponse]:
@@ -62,81 +127,44 @@ class UserService:
         """
         Create a new user in the database.
         """
-        query = """
-        INSERT INTO users (username, email, full_name, created_at, updated_at)
-        VALUES ($1, $2, $3, $4, $5)
-        RETURNING id, username, email, full_name, created_at, updated_at
-        """
-        
         # Use email as username if username not provided
         username = getattr(user_data, 'username', user_data.email.split('@')[0])
         now = datetime.now()
         
         row = await self.db.fetch_one(
-            query,
+            USER_INSERT,
             username,
             user_data.email,
             user_data.name,
             now,
             now
         )
-        
-        return UserResponse(
-            id=row['id'],
-            email=row['email'],
-            name=row['full_name'] or row['username'],
-            role=getattr(user_data, 'role', 'user'),  # Default role
-            is_active=True,
-            created_at=row['created_at'].isoformat() if row['created_at'] else now.isoformat()
-        )
+        self._on_write()
+        return user_from_row(row, role=getattr(user_data, 'role', 'user'))
     
     async def update_user(self, user_id: int, user_data: UserUpdate) -> Optional[UserResponse]:
         """
         Update a user in the database.
+        The statement for each combination of fields is compiled once and reused.
         """
-        # Build dynamic update query based on provided fields
-        update_fields = []
-        values = []
-        param_count = 1
-        
-        if hasattr(user_data, 'name') and user_data.name is not None:
-            update_fields.append(f"full_name = ${param_count}")
-            values.append(user_data.name)
-            param_count += 1
-            
-        if hasattr(user_data, 'email') and user_data.email is not None:
-            update_fields.append(f"email = ${param_count}")
-            values.append(user_data.email)
-            param_count += 1
+        updates = {
+            column: getattr(user_data, field)
+            for field, column in USER_UPDATE_COLUMNS.items()
+            if getattr(user_data, field) is not None
+        }
         
-        if not update_fields:
+        if not updates:
             # No fields to update, return current user
             return await self.get_user_by_id(user_id)
-            
-        update_fields.append(f"updated_at = ${param_count}")
-        values.append(datetime.now())
-        values.append(user_id)  # Add user_id for WHERE clause
         
-        query = f"""
-        UPDATE users 
-        SET {', '.join(update_fields)}
-        WHERE id = ${param_count + 1}
-        RETURNING id, username, email, full_name, created_at, updated_at
-        """
-        
-        row = await self.db.fetch_one(query, *values)
-        
-        if not row:
-            return None
-            
-        return UserResponse(
-            id=row['id'],
-            email=row['email'],
-            name=row['full_name'] or row['username'],
-            role="user",  # Default role
-            is_active=True,  # Default active
-            created_at=row['created_at'].isoformat() if row['created_at'] else datetime.now().isoformat()
+        row = await self.db.fetch_one(
+            user_update(tuple(updates)),
+            *updates.values(),
+            datetime.now(),
+            user_id
         )
+        self._on_write()
+        return user_from_row(row) if row else None
     
     async def delete_user(self, user_id: int) -> bool:
         """
@@ -145,7 +173,167 @@ class UserService:
         """
         query = "DELETE FROM users WHERE id = $1"
         result = await self.db.execute(query, user_id)
+        self._on_write()
+        
+        if self.shards and "DELETE 1" in result:
+            # No cross-database cascade, so remove the projects from the owner's shard
+            shard = await self.shards.for_owner(user_id)
+            await shard.execute("DELETE FROM projects WHERE owner_id = $1", user_id)
         
         # Check if any rows were affected
         return "DELETE 1" in result
-
+    
+    async def delete_user_in_background(self, user_id: int) -> Optional[UserDeletionStatus]:
+        """
+        Tombstone a user immediately and remove their projects in throttled batches.
+        Calling this again for a user whose deletion was interrupted resumes it.
+        """
+        query = """
+        WITH tombstoned AS (
+            UPDATE users SET deleted_at = $2
+            WHERE id = $1 AND deleted_at IS NULL
+            RETURNING id
+        )
+        INSERT INTO user_deletions (user_id, status, projects_total, requested_at)
+        SELECT id, 'pending', (SELECT COUNT(*) FROM projects WHERE owner_id = $1), $2
+        FROM tombstoned
+        RETURNING user_id, status, projects_total, projects_deleted, requested_at, completed_at
+        """
+        row = await self.db.fetch_one(query, user_id, datetime.now())
+        self._on_write()
+        
+        if row and self.shards:
+            # The count above ran against the main database; take it from the owner's shard
+            shard = await self.shards.for_owner(user_id)
+            total = await shard.fetch_val("SELECT COUNT(*) FROM projects WHERE owner_id = $1", user_id)
+            row = await self.db.fetch_one(
+                """
+                UPDATE user_deletions SET projects_total = $2 WHERE user_id = $1
+                RETURNING user_id, status, projects_total, projects_deleted, requested_at, completed_at
+                """,
+                user_id,
+                total
+            )
+        
+        if not row:
+            # Already tombstoned: resume if the previous run never finished
+            row = await self.db.fetch_one(
+                """
+                SELECT user_id, status, projects_total, projects_deleted, requested_at, completed_at
+                FROM user_deletions WHERE user_id = $1 AND status != 'completed'
+                """,
+                user_id
+            )
+            if not row:
+                return None
+        
+        self._start_purge(user_id)
+        return self._deletion_status(row)
+    
+    async def resume_deletions(self):
+        """
+        Restart purges left unfinished by a worker that stopped mid-deletion.
+        Every worker runs this at startup, so several may purge the same user at once;
+        their batches skip each other's locked rows and only the last one to find no
+        projects left removes the user.
+        """
+        try:
+            rows = await self.db.fetch_all(
+                "SELECT user_id FROM user_deletions WHERE status IN ('pending', 'running')"
+            )
+        except Exception as e:
+            print(f"❌ Could not resume background user deletions: {e}")
+            return
+        for row in rows:
+            self._start_purge(row['user_id'])
+        if rows:
+            print(f"✓ Resumed {len(rows)} background user deletions")
+    
+    def _start_purge(self, user_id: int):
+        """Purge a tombstoned user in a background task, unless one is already running here"""
+        if user_id in self._deletion_tasks:
+            return
+        # Run outside the request's context so its deadline doesn't apply to the purge
+        task = asyncio.create_task(self._purge_user(user_id), context=contextvars.Context())
+        self._deletion_tasks[user_id] = task
+        task.add_done_callback(lambda _: self._deletion_tasks.pop(user_id, None))
+    
+    async def get_deletion_status(self, user_id: int) -> Optional[UserDeletionStatus]:
+        """
+        Get the progress of a background user deletion.
+        """
+        query = """
+        SELECT user_id, status, projects_total, projects_deleted, requested_at, completed_at
+        FROM user_deletions WHERE user_id = $1
+        """
+        row = await self.db.fetch_one(query, user_id)
+        return self._deletion_status(row) if row else None
+    
+    async def _purge_user(self, user_id: int):
+        """
+        Delete a tombstoned user's projects in bounded batches, then the user row itself.
+        Each batch is its own short statement, so locks and WAL are released between batches.
+        Batches continue until one deletes nothing: a short batch can just mean another
+        purge of the same user holds the rest. The user row is only deleted once no
+        projects remain, so its cascade never turns into one large delete.
+        """
+        batch_size = self.settings.user_delete_batch_size
+        throttle = self.settings.user_delete_throttle_ms / 1000
+        
+        try:
+            while await self._delete_project_batch(user_id, batch_size):
+                await asyncio.sleep(throttle)
+            
+            if self.shards:
+                shard = await self.shards.for_owner(user_id)
+                if await shard.fetch_val("SELECT 1 FROM projects WHERE owner_id = $1 LIMIT 1", user_id):
+                    return  # Rows locked by a concurrent purge, which finishes the job
+            
+            await self.db.execute(USER_PURGE_DELETE, user_id)
+            if await self.db.fetch_val("SELECT 1 FROM users WHERE id = $1", user_id):
+                return  # Projects locked by a concurrent purge, which finishes the job
+            await self.db.execute(
+                "UPDATE user_deletions SET status = 'completed', completed_at = $2 WHERE user_id = $1",
+                user_id,
+                datetime.now()
+            )
+        except Exception as e:
+            print(f"❌ Background deletion of user {user_id} failed: {e}")
+            try:
+                await self.db.execute(
+                    "UPDATE user_deletions SET status = 'failed' WHERE user_id = $1", user_id
+                )
+            except Exception as mark_error:
+                # Left as pending/running, so the next startup resumes it
+                print(f"❌ Could not mark deletion of user {user_id} as failed: {mark_error}")
+    
+    async def _delete_project_batch(self, user_id: int, batch_size: int) -> int:
+        """Delete up to batch_size of a user's projects and record the progress"""
+        if not self.shards:
+            # Same database: delete and record progress in one statement
+            return await self.db.fetch_val(USER_PURGE_BATCH, user_id, batch_size)
+        
+        shard = await self.shards.for_owner(user_id)
+        deleted = await shard.fetch_val(
+            f"{PROJECT_DELETE_BATCH} SELECT COUNT(*) FROM batch", user_id, batch_size
+        )
+        await self.db.execute(
+            """
+            UPDATE user_deletions
+            SET status = 'running', projects_deleted = projects_deleted + $2
+            WHERE user_id = $1
+            """,
+            user_id,
+            deleted
+        )
+        return deleted
+    
+    def _deletion_status(self, row: dict) -> UserDeletionStatus:
+        return UserDeletionStatus(
+            user_id=row['user_id'],
+            status=row['status'],
+            projects_total=row['projects_total'],
+            projects_deleted=row['projects_deleted'],
+            requested_at=row['requested_at'].isoformat(),
+            completed_at=row['completed_at'].isoformat() if row['completed_at'] else None
+        )
@@ -57,6 +57,82 @@ class AppConfig(BaseSettings):
     db_user: str = os.getenv("DB_USER", "user")
     db_password: str = os.getenv("DB_PASSWORD", "password")
     db_name: str = os.getenv("DB_NAME", "dbname")
+    db_ssl: str = os.getenv("DB_SSL", "require")  # Neon needs 'require'; use 'disable' for a local PgBouncer
+    
+    # Serverless wake-up (Neon): connects retry with jittered backoff while compute resumes
+    db_connect_timeout_seconds: float = float(os.getenv("DB_CONNECT_TIMEOUT_SECONDS", "10"))
+    db_connect_retries: int = int(os.getenv("DB_CONNECT_RETRIES", "4"))
+    db_connect_backoff_base_ms: float = float(os.getenv("DB_CONNECT_BACKOFF_BASE_MS", "200"))
+    db_connect_backoff_max_ms: float = float(os.getenv("DB_CONNECT_BACKOFF_MAX_MS", "3000"))
+    db_wakeup_threshold_ms: float = float(os.getenv("DB_WAKEUP_THRESHOLD_MS", "500"))  # Slower connects count as wake-ups
+    # Keep compute awake inside these windows ("always", "mon-fri 08:00-18:00", ...); empty = never
+    db_keepalive_schedule: str = os.getenv("DB_KEEPALIVE_SCHEDULE", "")
+    db_keepalive_interval_seconds: float = float(os.getenv("DB_KEEPALIVE_INTERVAL_SECONDS", "240"))
+    db_keepalive_timezone: str = os.getenv("DB_KEEPALIVE_TIMEZONE", "")
+    # Start waking compute as soon as a request arrives after this long without queries (0 = off)
+    db_prewake_idle_seconds: float = float(os.getenv("DB_PREWAKE_IDLE_SECONDS", "0"))
+    
+    # PgBouncer compatibility: off, transaction (unnamed statements) or protocol (PgBouncer >= 1.21)
+    db_pgbouncer_mode: str = os.getenv("DB_PGBOUNCER_MODE", "off")
+    
+    # Sharding: "0=postgresql://...,1=postgresql://..." spreads projects across databases by owner.
+    # Users and the owner_shards directory stay in the main database above.
+    db_shards: str = os.getenv("DB_SHARDS", "")
+    db_shard_override_ttl_seconds: float = float(os.getenv("DB_SHARD_OVERRIDE_TTL_SECONDS", "30"))
+    
+    # Partitioning: archived projects live in a cold tier, optionally on another tablespace
+    db_archive_tablespace: str = os.getenv("DB_ARCHIVE_TABLESPACE", "")
+    partition_maintenance_interval_hours: float = float(os.getenv("PARTITION_MAINTENANCE_INTERVAL_HOURS", "24"))
+    
+    # Deadlines: per-request budget for DB work, plus a server-side statement_timeout ceiling
+    request_deadline_seconds: float = float(os.getenv("REQUEST_DEADLINE_SECONDS", "10"))
+    db_statement_timeout_ms: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+    
+    # Background user deletion: projects are removed in throttled batches
+    user_delete_batch_size: int = int(os.getenv("USER_DELETE_BATCH_SIZE", "500"))
+    user_delete_throttle_ms: int = int(os.getenv("USER_DELETE_THROTTLE_MS", "50"))
+    
+    # Group commit: merge concurrent project creates into one multi-row INSERT
+    project_write_coalescing: bool = os.getenv("PROJECT_WRITE_COALESCING", "false").lower() == "true"
+    project_write_coalesce_window_ms: float = float(os.getenv("PROJECT_WRITE_COALESCE_WINDOW_MS", "2"))
+    project_write_coalesce_max_batch: int = int(os.getenv("PROJECT_WRITE_COALESCE_MAX_BATCH", "64"))
+    
+    # Activity log: project events are buffered and appended with COPY off the request path
+    activity_flush_interval_ms: float = float(os.getenv("ACTIVITY_FLUSH_INTERVAL_MS", "500"))
+    activity_flush_batch_size: int = int(os.getenv("ACTIVITY_FLUSH_BATCH_SIZE", "1000"))
+    activity_max_buffered: int = int(os.getenv("ACTIVITY_MAX_BUFFERED", "100000"))
+    activity_max_flush_attempts: int = int(os.getenv("ACTIVITY_MAX_FLUSH_ATTEMPTS", "3"))
+    
+    # Bulk project updates: refuse selections matching more rows than this
+    project_bulk_update_max_rows: int = int(os.getenv("PROJECT_BULK_UPDATE_MAX_ROWS", "1000"))
+    
+    # Response cache: encoded list/detail responses replayed until a write bumps the data version.
+    # Versions are per worker, so the TTL bounds how long other workers' writes go unseen.
+    response_cache_enabled: bool = os.getenv("RESPONSE_CACHE_ENABLED", "false").lower() == "true"
+    response_cache_max_mb: float = float(os.getenv("RESPONSE_CACHE_MAX_MB", "64"))
+    response_cache_ttl_seconds: float = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "30"))
+    response_cache_compress: bool = os.getenv("RESPONSE_CACHE_COMPRESS", "true").lower() == "true"
+    response_cache_compress_min_bytes: int = int(os.getenv("RESPONSE_CACHE_COMPRESS_MIN_BYTES", "1024"))
+    
+    # List endpoints: let Postgres render the JSON response body instead of building models
+    db_json_rendering: bool = os.getenv("DB_JSON_RENDERING", "false").lower() == "true"
+    
+    # Counts: how long filtered COUNT(*) results are reused
+    count_cache_ttl_seconds: float = float(os.getenv("COUNT_CACHE_TTL_SECONDS", "5"))
+    
+    # User search: recent autocomplete results are reused until a user write or the TTL
+    user_search_cache_ttl_seconds: float = float(os.getenv("USER_SEARCH_CACHE_TTL_SECONDS", "30"))
+    user_search_cache_size: int = int(os.getenv("USER_SEARCH_CACHE_SIZE", "2048"))
+    
+    # Debug endpoints: disabled unless an admin token is set
+    debug_admin_token: str = os.getenv("DEBUG_ADMIN_TOKEN", "")
+    profile_sample_interval_ms: float = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+    
+    # Admission control: shed load before requests pile up on pool.acquire()
+    admission_control_enabled: bool = os.getenv("ADMISSION_CONTROL_ENABLED", "true").lower() == "true"
+    admission_max_queue_depth: int = int(os.getenv("ADMISSION_MAX_QUEUE_DEPTH", "20"))
+    admission_max_wait_ms: float = float(os.getenv("ADMISSION_MAX_WAIT_MS", "250"))
+    admission_retry_after: int = int(os.getenv("ADMISSION_RETRY_AFTER", "1"))
     
     @property
     def database(self) -> PostgressConfig:
@@ -0,0 +1,85 @@
+"""
+Tests for the buffered activity log writer.
+"""
+import asyncpg
+import pytest
+from services.activity_service import ActivityService
+from settings import AppConfig
+
+
+class FlakyActivityService(ActivityService):
+    """Writes to a list instead of COPY, failing while `error` is set or for bad events"""
+
+    def __init__(self, **settings):
+        super().__init__(None, AppConfig(
+            activity_flush_batch_size=settings.get("batch_size", 4),
+            activity_max_flush_attempts=settings.get("max_attempts", 2),
+        ))
+        self.error = None
+        self.copied = []
+
+    async def _copy(self, batch):
+        if self.error:
+            raise self.error
+        if any(event[1] < 0 for event in batch):
+            raise asyncpg.ForeignKeyViolationError("project does not exist")
+        self.copied.extend(event[1] for event in batch)
+
+
+def buffer_events(service: ActivityService, *project_ids: int):
+    # Straight into the buffer, so no background writer starts
+    service._buffer.extend((None, project_id, "updated", None, None) for project_id in project_ids)
+
+
+async def test_refused_batches_are_bisected_to_the_bad_event():
+    service = FlakyActivityService()
+    buffer_events(service, 1, 2, -3, 4, 5)
+
+    for _ in range(service.max_flush_attempts):
+        with pytest.raises(asyncpg.ForeignKeyViolationError):
+            await service.flush()
+    await service.flush()
+
+    assert service.copied == [1, 2, 4, 5]
+    assert service.stats["rejected"] == 1
+    assert service._buffer == []
+
+
+@pytest.mark.parametrize("error", [
+    asyncpg.CannotConnectNowError("starting up"),
+    asyncpg.AdminShutdownError("shutting down"),
+    asyncpg.TooManyConnectionsError("too many clients"),
+    asyncpg.QueryCanceledError("statement timeout"),
+    ConnectionResetError("reset by peer"),
+])
+async def test_connection_and_server_errors_leave_the_batch_buffered(error):
+    service = FlakyActivityService()
+    buffer_events(service, 1, 2, 3)
+    service.error = error
+
+    for _ in range(service.max_flush_attempts + 2):
+        with pytest.raises(type(error)):
+            await service.flush()
+
+    assert len(service._buffer) == 3
+    assert service.stats["rejected"] == 0
+    service.error = None
+    await service.flush()
+    assert service.copied == [1, 2, 3]
+
+
+async def test_connection_loss_while_bisecting_keeps_the_rest_buffered():
+    service = FlakyActivityService(max_attempts=1)
+    buffer_events(service, -1, 2, 3, 4)
+    with pytest.raises(asyncpg.ForeignKeyViolationError):
+        await service.flush()
+
+    service.error = asyncpg.CannotConnectNowError("starting up")
+    with pytest.raises(asyncpg.CannotConnectNowError):
+        await service.flush()
+    assert len(service._buffer) == 4
+
+    service.error = None
+    await service.flush()
+    assert service.copied == [2, 3, 4]
+    assert service.stats["rejected"] == 1
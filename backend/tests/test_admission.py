@@ -0,0 +1,74 @@
+"""
+Tests for pool-saturation admission control.
+"""
+import httpx
+from middleware.admission import AdmissionControlMiddleware, AdmissionController, Priority
+
+
+class FakePool:
+    """Stands in for DataBridge's pool wait-queue metrics"""
+
+    def __init__(self, queue_depth: int = 0, wait_ms: float = 0):
+        self.acquire_queue_depth = queue_depth
+        self.acquire_wait_ms = wait_ms
+
+
+def test_priority_comes_from_route_then_method():
+    controller = AdmissionController(FakePool(), max_queue_depth=10, max_wait_ms=100)
+
+    assert controller.priority_for("GET", "/health") == Priority.EXEMPT
+    assert controller.priority_for("GET", "/health/") == Priority.EXEMPT
+    assert controller.priority_for("GET", "/") == Priority.EXEMPT
+    assert controller.priority_for("GET", "/ready") == Priority.CRITICAL
+    assert controller.priority_for("GET", "/api/v1/projects") == Priority.READ
+    assert controller.priority_for("POST", "/api/v1/projects") == Priority.WRITE
+    assert controller.priority_for("DELETE", "/api/v1/users/1") == Priority.WRITE
+
+
+def test_route_priorities_override_defaults():
+    controller = AdmissionController(
+        FakePool(), 10, 100, route_priorities={"/api/v1/dashboard": Priority.CRITICAL}
+    )
+    assert controller.priority_for("GET", "/api/v1/dashboard") == Priority.CRITICAL
+
+
+def test_reads_are_shed_before_writes_and_critical():
+    pool = FakePool(queue_depth=10)
+    controller = AdmissionController(pool, max_queue_depth=10, max_wait_ms=100)
+
+    assert controller.should_shed(Priority.READ)
+    assert not controller.should_shed(Priority.WRITE)
+    pool.acquire_queue_depth = 20
+    assert controller.should_shed(Priority.WRITE)
+    assert not controller.should_shed(Priority.CRITICAL)
+    assert not controller.should_shed(Priority.EXEMPT)
+    assert controller.shed_counts["read"] == 1
+    assert controller.shed_counts["write"] == 1
+
+
+def test_acquire_wait_time_alone_sheds():
+    controller = AdmissionController(FakePool(wait_ms=150), max_queue_depth=10, max_wait_ms=100)
+
+    assert controller.should_shed(Priority.READ)
+    assert not controller.should_shed(Priority.WRITE)
+
+
+async def test_middleware_answers_503_with_retry_after():
+    calls = []
+
+    async def app(scope, receive, send):
+        calls.append(scope["path"])
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    pool = FakePool(queue_depth=10)
+    middleware = AdmissionControlMiddleware(app, lambda: pool, max_queue_depth=10, retry_after=3)
+    transport = httpx.ASGITransport(app=middleware)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        shed = await client.get("/api/v1/projects")
+        admitted = await client.post("/api/v1/projects")
+
+    assert shed.status_code == 503
+    assert shed.headers["retry-after"] == "3"
+    assert admitted.status_code == 200
+    assert calls == ["/api/v1/projects"]
@@ -0,0 +1,32 @@
+"""
+Tests for the in-process TTLCache and DataVersions.
+"""
+from services.cache import DataVersions, TTLCache
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(ttl_seconds=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(ttl_seconds=-1)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+
+def test_data_versions_bump_only_named_resources():
+    versions = DataVersions()
+    versions.bump("projects", "users")
+    versions.bump("users")
+
+    assert versions.get("projects") == 1
+    assert versions.get("users") == 2
+    assert versions.get("activity") == 0
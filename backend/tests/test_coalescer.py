@@ -0,0 +1,152 @@
+"""
+Tests for the group-commit WriteCoalescer.
+"""
+import asyncio
+import time
+import asyncpg
+import pytest
+from database.databridge import request_deadline
+from models.project import ProjectCreate
+from services.cache import data_versions
+from services.coalescer import WriteCoalescer
+from services.project_service import ProjectService
+from settings import AppConfig
+
+
+class FakeWriter:
+    """write_batch stand-in: records each call and fails whole batches containing 'bad'"""
+
+    def __init__(self, error: type[Exception] = asyncpg.exceptions.UniqueViolationError):
+        self.calls: list[list] = []
+        self.error = error
+
+    async def __call__(self, items: list) -> list:
+        self.calls.append(items)
+        if "bad" in items:
+            raise self.error("duplicate key")
+        return [f"row:{item}" for item in items]
+
+
+async def test_concurrent_submits_share_one_batch():
+    writer = FakeWriter()
+    coalescer = WriteCoalescer(writer, window_seconds=0.01, max_batch=64)
+
+    results = await asyncio.gather(*(coalescer.submit(i) for i in range(5)))
+
+    assert results == [f"row:{i}" for i in range(5)]
+    assert writer.calls == [[0, 1, 2, 3, 4]]
+    assert coalescer.stats == {"batches": 1, "items": 5, "split_batches": 0}
+
+
+async def test_full_batch_is_written_without_waiting_for_the_window():
+    writer = FakeWriter()
+    coalescer = WriteCoalescer(writer, window_seconds=60, max_batch=3)
+
+    results = await asyncio.wait_for(asyncio.gather(*(coalescer.submit(i) for i in range(3))), 1)
+
+    assert results == ["row:0", "row:1", "row:2"]
+    assert writer.calls == [[0, 1, 2]]
+
+
+async def test_rejected_batch_is_retried_row_by_row():
+    writer = FakeWriter()
+    coalescer = WriteCoalescer(writer, window_seconds=0.01, max_batch=64)
+
+    results = await asyncio.gather(
+        *(coalescer.submit(item) for item in ["a", "bad", "c"]), return_exceptions=True
+    )
+
+    assert results[0] == "row:a"
+    assert isinstance(results[1], asyncpg.exceptions.UniqueViolationError)
+    assert results[2] == "row:c"
+    assert writer.calls == [["a", "bad", "c"], ["a"], ["bad"], ["c"]]
+    # Retries are part of the same coalesced batch, not new items
+    assert coalescer.stats == {"batches": 1, "items": 3, "split_batches": 1}
+
+
+async def test_other_errors_fail_every_caller_in_the_batch():
+    writer = FakeWriter(error=ConnectionError)
+    coalescer = WriteCoalescer(writer, window_seconds=0.01, max_batch=64)
+
+    results = await asyncio.gather(
+        *(coalescer.submit(item) for item in ["a", "bad"]), return_exceptions=True
+    )
+
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert writer.calls == [["a", "bad"]]
+
+
+async def test_cancelled_caller_does_not_break_the_batch():
+    writer = FakeWriter()
+    coalescer = WriteCoalescer(writer, window_seconds=0.01, max_batch=64)
+
+    cancelled = asyncio.create_task(coalescer.submit("a"))
+    kept = asyncio.create_task(coalescer.submit("b"))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    assert await kept == "row:b"
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+
+
+async def test_caller_waits_only_until_its_deadline():
+    written = []
+
+    async def slow_writer(items):
+        await asyncio.sleep(0.1)
+        written.extend(items)
+        return items
+
+    coalescer = WriteCoalescer(slow_writer, window_seconds=0.001, max_batch=64)
+    token = request_deadline.set(time.monotonic() + 0.02)
+    try:
+        with pytest.raises(asyncio.TimeoutError):
+            await coalescer.submit("a")
+    finally:
+        request_deadline.reset(token)
+
+    await asyncio.gather(*coalescer._flushes)
+    assert written == ["a"]
+
+
+class FakeProjectDB:
+    """Returns inserted rows for PROJECT_INSERT_MANY after a delay"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.next_id = 0
+
+    async def fetch_all(self, query, names, descriptions, statuses, owner_ids, created, updated):
+        await asyncio.sleep(self.delay)
+        rows = []
+        for name, status, owner_id in zip(names, statuses, owner_ids):
+            self.next_id += 1
+            rows.append({"id": self.next_id, "name": name, "status": status, "owner_id": owner_id})
+        return rows
+
+
+class RecordingActivity:
+    def __init__(self):
+        self.events = []
+
+    def record(self, project_id, event_type, owner_id=None, changes=None):
+        self.events.append((project_id, event_type, owner_id))
+
+
+async def test_write_hooks_run_for_creates_whose_caller_gave_up():
+    activity = RecordingActivity()
+    settings = AppConfig(project_write_coalescing=True, project_write_coalesce_window_ms=1)
+    service = ProjectService(FakeProjectDB(delay=0.1), settings, activity)
+    version = data_versions.get("projects")
+
+    token = request_deadline.set(time.monotonic() + 0.02)
+    try:
+        with pytest.raises(asyncio.TimeoutError):
+            await service.create_project(ProjectCreate(name="late", owner_id=7))
+    finally:
+        request_deadline.reset(token)
+    await asyncio.gather(*service._create_coalescer._flushes)
+
+    assert activity.events == [(1, "created", 7)]
+    assert data_versions.get("projects") == version + 1
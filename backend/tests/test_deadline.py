@@ -0,0 +1,108 @@
+"""
+Tests for request deadlines and disconnect cancellation.
+"""
+import asyncio
+import time
+import pytest
+from database.databridge import remaining_deadline, request_deadline, set_request_deadline
+from middleware.deadline import RequestDeadlineMiddleware
+
+
+def disconnect_after(seconds: float):
+    """receive() that reports a client disconnect after `seconds`"""
+    async def receive():
+        await asyncio.sleep(seconds)
+        return {"type": "http.disconnect"}
+    return receive
+
+
+async def discard(message):
+    pass
+
+
+async def test_app_runs_under_the_default_deadline():
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(remaining_deadline())
+
+    await RequestDeadlineMiddleware(app, default_seconds=5)({"type": "http"}, disconnect_after(1), discard)
+
+    assert 4 < seen[0] <= 5
+    # The deadline belongs to the request, not to the server's context
+    assert request_deadline.get() is None
+
+
+async def test_route_deadline_only_narrows():
+    seen = []
+
+    async def app(scope, receive, send):
+        set_request_deadline(60)
+        seen.append(remaining_deadline())
+        set_request_deadline(1)
+        seen.append(remaining_deadline())
+
+    await RequestDeadlineMiddleware(app, default_seconds=5)({"type": "http"}, disconnect_after(1), discard)
+
+    assert 4 < seen[0] <= 5
+    assert seen[1] <= 1
+
+
+def test_expired_deadline_raises_before_querying():
+    token = request_deadline.set(time.monotonic() - 1)
+    try:
+        with pytest.raises(asyncio.TimeoutError):
+            remaining_deadline()
+    finally:
+        request_deadline.reset(token)
+
+
+async def test_disconnect_cancels_the_request():
+    finished = []
+
+    async def app(scope, receive, send):
+        await asyncio.sleep(1)
+        finished.append(True)
+
+    middleware = RequestDeadlineMiddleware(app)
+    await asyncio.wait_for(middleware({"type": "http"}, disconnect_after(0.01), discard), 0.5)
+
+    assert finished == []
+    assert middleware.cancelled_requests == 1
+
+
+async def test_disconnect_after_the_response_leaves_trailing_work_alone():
+    finished = []
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+        await asyncio.sleep(0.05)  # Background tasks, dependency teardown
+        finished.append(True)
+
+    middleware = RequestDeadlineMiddleware(app)
+    await middleware({"type": "http"}, disconnect_after(0.01), discard)
+
+    assert finished == [True]
+    assert middleware.cancelled_requests == 0
+
+
+async def test_app_still_receives_request_messages():
+    messages = iter([
+        {"type": "http.request", "body": b"payload", "more_body": False},
+        {"type": "http.disconnect"},
+    ])
+    received = []
+
+    async def receive():
+        await asyncio.sleep(0)
+        return next(messages)
+
+    async def app(scope, receive, send):
+        received.append(await receive())
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    await RequestDeadlineMiddleware(app)({"type": "http"}, receive, discard)
+
+    assert received[0]["body"] == b"payload"
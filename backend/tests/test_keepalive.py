@@ -0,0 +1,72 @@
+"""
+Tests for the keepalive schedule.
+"""
+from datetime import datetime, time
+import pytest
+from database.keepalive import in_schedule, parse_schedule
+
+
+# 2024-01-01 was a Monday
+def at(day: int, hour: int, minute: int = 0) -> datetime:
+    return datetime(2024, 1, day, hour, minute)
+
+
+def test_parse_always_and_empty():
+    assert parse_schedule("always") == [(frozenset(range(7)), time.min, time.max)]
+    assert parse_schedule(" Always ") == parse_schedule("always")
+    assert parse_schedule("") == []
+
+
+def test_parse_day_ranges_and_windows():
+    windows = parse_schedule("mon-fri 08:00-18:00; sat 10:00-14:00")
+
+    assert windows == [
+        (frozenset(range(5)), time(8), time(18)),
+        (frozenset({5}), time(10), time(14)),
+    ]
+    assert parse_schedule("mon,wed,fri 09:00-10:00")[0][0] == frozenset({0, 2, 4})
+    # Ranges may wrap past Sunday
+    assert parse_schedule("fri-mon 09:00-10:00")[0][0] == frozenset({4, 5, 6, 0})
+
+
+@pytest.mark.parametrize("spec", [
+    "weekdays 08:00-18:00",
+    "mon-fri",
+    "mon-fri 8-18",
+    "mon-fri 08:00-25:00",
+    "mon-fri 08:00-18:00;",
+])
+def test_invalid_windows_raise(spec):
+    with pytest.raises(ValueError):
+        parse_schedule(spec)
+
+
+def test_in_schedule_respects_days_and_hours():
+    windows = parse_schedule("mon-fri 08:00-18:00")
+
+    assert in_schedule(windows, at(1, 8))
+    assert in_schedule(windows, at(5, 17, 59))
+    assert not in_schedule(windows, at(1, 7, 59))
+    assert not in_schedule(windows, at(1, 18))  # End is exclusive
+    assert not in_schedule(windows, at(6, 12))  # Saturday
+    assert not in_schedule([], at(1, 12))
+    assert in_schedule(parse_schedule("always"), at(7, 3))
+
+
+def test_windows_past_midnight_belong_to_the_day_they_start():
+    windows = parse_schedule("fri 22:00-02:00")
+
+    assert in_schedule(windows, at(5, 23))   # Friday night
+    assert in_schedule(windows, at(6, 1))    # Early Saturday
+    assert not in_schedule(windows, at(6, 2))
+    assert not in_schedule(windows, at(6, 23))  # Saturday night is not scheduled
+    assert not in_schedule(windows, at(5, 1))   # Nor is early Friday
+
+
+def test_sunday_window_wraps_into_monday():
+    windows = parse_schedule("sun 23:00-01:00")
+
+    assert in_schedule(windows, at(7, 23, 30))
+    assert in_schedule(windows, at(8, 0, 30))
+    assert in_schedule(windows, at(1, 0, 30))  # Any Monday, not just one in the same week
+    assert not in_schedule(windows, at(2, 0, 30))
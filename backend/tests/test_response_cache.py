@@ -0,0 +1,204 @@
+"""
+Tests for the response cache middleware and its byte-bounded LRU store.
+"""
+import gzip
+import json
+import httpx
+import pytest
+from middleware.profiling import RequestProfilingMiddleware
+from middleware.response_cache import ResponseCache, ResponseCacheMiddleware
+from services.cache import DataVersions
+
+
+class CountingApp:
+    """ASGI app that returns a JSON body echoing the path and query, counting calls"""
+
+    def __init__(self, status: int = 200, padding: int = 0):
+        self.calls = 0
+        self.status = status
+        self.padding = padding
+
+    async def __call__(self, scope, receive, send):
+        self.calls += 1
+        body = json.dumps({
+            "path": scope["path"],
+            "query": scope["query_string"].decode(),
+            "call": self.calls,
+            "padding": "x" * self.padding,
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": self.status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def make_client(app, versions: DataVersions, **options) -> httpx.AsyncClient:
+    middleware = ResponseCacheMiddleware(
+        app, versions=versions, max_bytes=options.pop("max_bytes", 1 << 20),
+        ttl_seconds=options.pop("ttl_seconds", 60), **options
+    )
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=middleware), base_url="http://test")
+
+
+@pytest.fixture
+def versions():
+    return DataVersions()
+
+
+async def test_repeated_get_is_served_from_cache(versions):
+    app = CountingApp()
+    async with make_client(app, versions) as client:
+        first = await client.get("/api/v1/projects")
+        second = await client.get("/api/v1/projects")
+
+    assert first.headers["x-cache"] == "miss"
+    assert second.headers["x-cache"] == "hit"
+    assert second.content == first.content
+    assert app.calls == 1
+
+
+async def test_query_parameter_order_shares_an_entry(versions):
+    app = CountingApp()
+    async with make_client(app, versions) as client:
+        await client.get("/api/v1/projects?owner_id=1&status=active")
+        response = await client.get("/api/v1/projects?status=active&owner_id=1")
+        other = await client.get("/api/v1/projects?owner_id=2")
+
+    assert response.headers["x-cache"] == "hit"
+    assert other.headers["x-cache"] == "miss"
+    assert app.calls == 2
+
+
+async def test_version_bump_invalidates_dependent_routes(versions):
+    app = CountingApp()
+    async with make_client(app, versions) as client:
+        await client.get("/api/v1/projects/1")
+        await client.get("/api/v1/users/1")
+        versions.bump("users")
+        projects = await client.get("/api/v1/projects/1")
+        users = await client.get("/api/v1/users/1")
+        versions.bump("projects")
+        users_again = await client.get("/api/v1/users/1")
+
+    # Project responses carry owner names, so a user write invalidates them too
+    assert projects.headers["x-cache"] == "miss"
+    assert users.headers["x-cache"] == "miss"
+    assert users_again.headers["x-cache"] == "hit"
+    assert app.calls == 4
+
+
+async def test_uncached_routes_methods_and_errors_pass_through(versions):
+    app = CountingApp()
+    async with make_client(app, versions) as client:
+        other_route = [await client.get("/api/v1/dashboard") for _ in range(2)]
+        posts = [await client.post("/api/v1/projects") for _ in range(2)]
+    assert all("x-cache" not in response.headers for response in other_route + posts)
+    assert app.calls == 4
+
+    failing = CountingApp(status=500)
+    async with make_client(failing, versions) as client:
+        responses = [await client.get("/api/v1/projects") for _ in range(2)]
+    assert [response.headers["x-cache"] for response in responses] == ["miss", "miss"]
+    assert failing.calls == 2
+
+
+async def test_large_bodies_are_replayed_gzipped_only_to_gzip_clients(versions):
+    app = CountingApp(padding=5000)
+    async with make_client(app, versions, compress_min_bytes=1024) as client:
+        miss = await client.get("/api/v1/projects", headers={"accept-encoding": "gzip"})
+        gzipped = await client.get("/api/v1/projects", headers={"accept-encoding": "gzip"})
+        plain = await client.get("/api/v1/projects", headers={"accept-encoding": "identity"})
+
+    # The miss is sent as the app produced it
+    assert "content-encoding" not in miss.headers
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert int(gzipped.headers["content-length"]) < len(miss.content)
+    assert gzipped.content == miss.content  # httpx decodes the gzip body
+    assert "content-encoding" not in plain.headers
+    assert plain.content == miss.content
+    assert plain.headers["vary"] == "Accept-Encoding"
+    assert app.calls == 1
+
+
+async def test_small_bodies_are_stored_uncompressed(versions):
+    app = CountingApp()
+    async with make_client(app, versions, compress_min_bytes=1024) as client:
+        await client.get("/api/v1/users")
+        hit = await client.get("/api/v1/users", headers={"accept-encoding": "gzip"})
+
+    assert hit.headers["x-cache"] == "hit"
+    assert "content-encoding" not in hit.headers
+
+
+def test_cache_evicts_least_recently_used_to_stay_under_max_bytes():
+    cache = ResponseCache(max_bytes=10, ttl_seconds=60)
+    cache.set("a", [], b"aaaa", False)
+    cache.set("b", [], b"bbbb", False)
+    assert cache.get("a") is not None  # "a" is now the most recently used
+    cache.set("c", [], b"cccc", False)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == ([], b"aaaa", False)
+    assert cache.get("c") == ([], b"cccc", False)
+    assert cache.size == 8
+    assert cache.stats["evictions"] == 1
+
+
+def test_cache_skips_bodies_larger_than_the_bound_and_replaces_entries():
+    cache = ResponseCache(max_bytes=10, ttl_seconds=60)
+    cache.set("big", [], b"x" * 11, False)
+    cache.set("a", [], b"aaaa", False)
+    cache.set("a", [], b"aa", False)
+
+    assert cache.get("big") is None
+    assert cache.get("a") == ([], b"aa", False)
+    assert cache.size == 2
+
+
+def test_expired_entries_are_misses():
+    cache = ResponseCache(max_bytes=100, ttl_seconds=-1)
+    cache.set("a", [], b"aaaa", False)
+
+    assert cache.get("a") is None
+    assert cache.size == 0
+    assert cache.stats == {"hits": 0, "misses": 1, "evictions": 0}
+
+
+async def test_profiled_requests_bypass_the_cache(versions):
+    app = CountingApp()
+    async with make_client(app, versions) as client:
+        await client.get("/api/v1/projects")
+        profiled = await client.get("/api/v1/projects", headers={"x-profile": "1"})
+        cached = await client.get("/api/v1/projects")
+
+    assert "x-cache" not in profiled.headers
+    assert cached.headers["x-cache"] == "hit"
+    assert app.calls == 2
+
+
+async def test_profile_ids_are_never_replayed(versions):
+    app = CountingApp()
+    profiling = RequestProfilingMiddleware(app, admin_token="secret", interval=0.001)
+    async with make_client(profiling, versions) as client:
+        # Same order as the app: the profiler sits inside the cache
+        profiled = await client.get(
+            "/api/v1/projects", headers={"x-profile": "1", "x-admin-token": "secret"}
+        )
+        first = await client.get("/api/v1/projects")
+        second = await client.get("/api/v1/projects")
+
+    assert "x-profile-id" in profiled.headers
+    assert first.headers["x-cache"] == "miss"
+    assert second.headers["x-cache"] == "hit"
+    assert "x-profile-id" not in second.headers
+    assert app.calls == 2
+
+
+async def test_stored_headers_drop_profile_ids(versions):
+    middleware = ResponseCacheMiddleware(CountingApp(), versions=versions, max_bytes=1 << 20, ttl_seconds=60)
+    middleware._store("key", [(b"content-type", b"application/json"), (b"x-profile-id", b"7")], b"{}")
+
+    headers, _, _ = middleware.cache.get("key")
+    assert (b"x-profile-id", b"7") not in headers
@@ -0,0 +1,129 @@
+"""
+Tests for shard configuration, the owner hash ring and override refreshes.
+"""
+import asyncio
+from collections import Counter
+import pytest
+from database.shards import SHARD_ID_STRIDE, ShardRouter, parse_shards
+from settings import AppConfig
+
+
+SHARDS = "0=postgresql://shard0/db, 1=postgresql://shard1/db,2=postgresql://shard2/db"
+
+
+class FakeDirectory:
+    """Stands in for the main database's owner_shards table"""
+
+    def __init__(self, overrides: dict[int, int] = None):
+        self.overrides = overrides or {}
+        self.loads = 0
+        self.fail = False
+
+    async def fetch_all(self, query: str, *args):
+        self.loads += 1
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise ConnectionError("directory unavailable")
+        return [{"owner_id": owner, "shard_id": shard} for owner, shard in self.overrides.items()]
+
+
+def make_router(directory: FakeDirectory, shards: str = SHARDS, ttl: float = 30) -> ShardRouter:
+    settings = AppConfig(database_url="postgresql://main/db", db_shards=shards, db_shard_override_ttl_seconds=ttl)
+    return ShardRouter(directory, settings)
+
+
+def test_parse_shards():
+    assert parse_shards(SHARDS) == {
+        0: "postgresql://shard0/db",
+        1: "postgresql://shard1/db",
+        2: "postgresql://shard2/db",
+    }
+    assert parse_shards("") == {}
+    assert parse_shards("3=postgresql://a/db,") == {3: "postgresql://a/db"}
+
+
+def test_parse_shards_rejects_ids_outside_the_stride():
+    with pytest.raises(ValueError):
+        parse_shards(f"{SHARD_ID_STRIDE}=postgresql://a/db")
+    with pytest.raises(ValueError):
+        parse_shards("-1=postgresql://a/db")
+    with pytest.raises(ValueError):
+        parse_shards("primary=postgresql://a/db")
+
+
+def test_router_needs_shards():
+    with pytest.raises(ValueError):
+        make_router(FakeDirectory(), shards="")
+
+
+def test_ring_is_stable_and_spreads_owners():
+    router = make_router(FakeDirectory())
+    owners = range(1, 3001)
+    placement = [router.ring_shard_for_owner(owner) for owner in owners]
+
+    assert placement == [make_router(FakeDirectory()).ring_shard_for_owner(owner) for owner in owners]
+    counts = Counter(placement)
+    assert set(counts) == {0, 1, 2}
+    assert all(count > 600 for count in counts.values())
+
+
+def test_adding_a_shard_only_moves_owners_onto_it():
+    before = make_router(FakeDirectory())
+    after = make_router(FakeDirectory(), shards=SHARDS + ",3=postgresql://shard3/db")
+
+    for owner in range(1, 3001):
+        old, new = before.ring_shard_for_owner(owner), after.ring_shard_for_owner(owner)
+        assert new == old or new == 3
+
+
+def test_projects_are_looked_up_on_their_creating_shard_first():
+    router = make_router(FakeDirectory())
+
+    assert router.for_project(2)[0] is router.shards[1]
+    assert router.for_project(2 + SHARD_ID_STRIDE)[0] is router.shards[1]
+    assert len(router.for_project(1)) == 3
+
+
+async def test_overrides_take_precedence_over_the_ring():
+    owner = 7
+    ring_shard = make_router(FakeDirectory()).ring_shard_for_owner(owner)
+    moved_to = (ring_shard + 1) % 3
+    router = make_router(FakeDirectory({owner: moved_to}))
+
+    assert await router.shard_id_for_owner(owner) == moved_to
+    assert await router.for_owner(owner) is router.shards[moved_to]
+
+
+async def test_concurrent_callers_share_one_override_load():
+    directory = FakeDirectory({7: 2})
+    router = make_router(directory)
+
+    results = await asyncio.gather(*(router.shard_id_for_owner(7) for _ in range(20)))
+
+    assert results == [2] * 20
+    assert directory.loads == 1
+    await router.shard_id_for_owner(7)
+    assert directory.loads == 1  # Still within the TTL
+
+
+async def test_failed_override_load_is_retried_on_the_next_call():
+    directory = FakeDirectory({7: 2})
+    directory.fail = True
+    router = make_router(directory)
+    with pytest.raises(ConnectionError):
+        await router.shard_id_for_owner(7)
+
+    directory.fail = False
+    assert await router.shard_id_for_owner(7) == 2
+    assert directory.loads == 2
+
+
+async def test_failed_override_load_keeps_the_current_map():
+    directory = FakeDirectory({7: 2})
+    router = make_router(directory, ttl=0)
+    assert await router.shard_id_for_owner(7) == 2
+
+    directory.fail = True
+    with pytest.raises(ConnectionError):
+        await router.shard_id_for_owner(7)
+    assert router._overrides == {7: 2}
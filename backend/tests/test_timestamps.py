@@ -0,0 +1,56 @@
+"""
+Tests for time-zone handling of timestamp inputs.
+"""
+from datetime import datetime, timedelta, timezone
+import httpx
+from fastapi import FastAPI
+from dependencies import get_activity_service
+from models.project import ProjectBulkUpdate
+from models.timestamps import to_local_naive
+from routers import activity
+
+
+class RecordingActivityService:
+    def __init__(self):
+        self.calls = []
+
+    async def get_activity(self, since, until, limit):
+        self.calls.append((since, until))
+        return []
+
+
+def test_aware_values_become_server_local_naive():
+    aware = datetime(2024, 5, 1, 12, 0, tzinfo=timezone(timedelta(hours=2)))
+    local = to_local_naive(aware)
+
+    assert local.tzinfo is None
+    assert local == aware.astimezone().replace(tzinfo=None)
+    assert to_local_naive(datetime(2024, 5, 1)) == datetime(2024, 5, 1)
+
+
+async def test_activity_range_accepts_utc_offsets():
+    service = RecordingActivityService()
+    app = FastAPI()
+    app.include_router(activity.router)
+    app.dependency_overrides[get_activity_service] = lambda: service
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get(
+            "/activity", params={"since": "2024-05-01T00:00:00Z", "until": "2024-05-02T00:00:00+02:00"}
+        )
+
+    assert response.status_code == 200
+    since, until = service.calls[0]
+    assert since.tzinfo is None and until.tzinfo is None
+    assert until - since == timedelta(hours=22)
+
+
+def test_bulk_update_filters_are_normalized():
+    bulk = ProjectBulkUpdate(
+        created_after="2024-05-01T00:00:00Z", created_before="2024-06-01T00:00:00",
+        update={"status": "archived"},
+    )
+
+    assert bulk.created_after == to_local_naive(datetime(2024, 5, 1, tzinfo=timezone.utc))
+    assert bulk.created_after.tzinfo is None
+    assert bulk.created_before == datetime(2024, 6, 1)